@@ -0,0 +1,155 @@
+"""
+ASGI entry point for high-concurrency deployments (e.g. uvicorn asgi:application)
+
+Serves the same Flask app as wsgi.py. The event loop only holds connections:
+request bodies are read and responses written asynchronously, and each
+request runs on a bounded thread pool, so AI searches and DB writes never
+block the loop. Long-polls (GET /move_jobs/<id>?wait=N) wait on the loop
+instead of holding a thread.
+"""
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode
+
+# Add project root to path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# Add backend directory to path
+backend_dir = os.path.join(project_root, 'backend')
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from backend.app import app, move_jobs, MAX_JOB_WAIT, warm_up
+from job_queue import FINISHED
+from move_pool import shutdown_pool
+
+# Requests (and so AI searches and DB writes) running at once
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 32))
+JOB_POLL_INTERVAL = 0.02  # seconds between checks of a long-polled job
+
+executor = ThreadPoolExecutor(max_workers=ASGI_THREADS, thread_name_prefix='asgi')
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI http scope and its request body"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'CONTENT_LENGTH':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def run_wsgi(environ):
+    """Runs the Flask app for one request on a pool thread; returns (status, headers, body)"""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = headers
+
+    chunks = app(environ, start_response)
+    try:
+        body = b''.join(chunks)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response['headers']]
+    return response['status'], headers, body
+
+
+async def wait_for_job(scope):
+    """
+    Does the ?wait= part of GET /move_jobs/<id> on the event loop, then returns
+    the query string without it so the Flask route answers at once
+    """
+    query = parse_qsl(scope.get('query_string', b'').decode('latin-1'))
+    try:
+        wait = min(max(float(dict(query).get('wait', 0)), 0), MAX_JOB_WAIT)
+    except ValueError:
+        return None  # Let the route report the bad value
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    job_id = scope['path'].rsplit('/', 1)[1]
+    while loop.time() < deadline:
+        job = move_jobs.get(job_id)
+        if job is None or job.status in FINISHED:
+            break
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+    return urlencode([(name, value) for name, value in query if name != 'wait']).encode('latin-1')
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Serve at once; /ready answers 503 until the warm-up has finished
+            asyncio.get_running_loop().run_in_executor(executor, warm_up)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=False, cancel_futures=True)
+            shutdown_pool()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+
+    if scope['method'] == 'GET' and scope['path'].startswith('/move_jobs/'):
+        query_string = await wait_for_job(scope)
+        if query_string is not None:
+            scope = dict(scope, query_string=query_string)
+
+    environ = build_environ(scope, b''.join(chunks))
+    loop = asyncio.get_running_loop()
+    status, headers, body = await loop.run_in_executor(executor, run_wsgi, environ)
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(application, host='0.0.0.0', port=int(os.environ.get('PORT', 5001)))
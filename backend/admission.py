@@ -0,0 +1,111 @@
+"""
+Admission control for the CPU-heavy endpoints (/move, /play, /move_batch).
+
+Each request takes a weight of AI capacity for as long as it runs: a hard
+search costs more than an easy one. When the capacity is in use, requests
+wait in a bounded FIFO queue for a short time; when the queue is full or the
+wait runs out they are turned away at once (the app answers 503 with
+Retry-After) instead of piling up behind the searches. Routes that do not
+search, like /reset and /check_game_state, never go through here and keep
+their latency while the AI is saturated.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+# Total weight of AI requests running at once (a hard search weighs 4)
+DEFAULT_CAPACITY = int(os.environ.get('ADMISSION_CAPACITY', 4 * (os.cpu_count() or 1)))
+DEFAULT_MAX_QUEUE = int(os.environ.get('ADMISSION_MAX_QUEUE', 64))
+DEFAULT_MAX_WAIT = float(os.environ.get('ADMISSION_MAX_WAIT', 1.0))  # seconds
+
+# Relative CPU cost of one search per difficulty
+DIFFICULTY_WEIGHTS = {'easy': 1, 'medium': 2, 'hard': 4, 'mcts': 4}
+
+
+def parse_weights(text, defaults=DIFFICULTY_WEIGHTS):
+    """Weights from 'easy=1,hard=4' (ADMISSION_WEIGHTS); unnamed difficulties keep their defaults."""
+    weights = dict(defaults)
+    for part in filter(None, (part.strip() for part in text.split(','))):
+        difficulty, _, weight = part.partition('=')
+        weights[difficulty.strip().lower()] = max(int(weight), 1)
+    return weights
+
+
+WEIGHTS = parse_weights(os.environ.get('ADMISSION_WEIGHTS', ''))
+
+
+class AdmissionRejected(Exception):
+    """Raised by AdmissionController.acquire when a request cannot be admitted."""
+
+    def __init__(self, reason):
+        super().__init__('Server is busy, try again shortly')
+        self.reason = reason  # 'queue_full' or 'timeout'
+
+
+class AdmissionController:
+    """Weighted concurrency limit with a bounded, first-come first-served wait queue."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_queue=DEFAULT_MAX_QUEUE, max_wait=DEFAULT_MAX_WAIT):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_use = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waiting = deque()
+        self._cond = threading.Condition()
+
+    def acquire(self, weight):
+        """
+        Takes weight units of capacity, waiting up to max_wait seconds in the
+        queue; returns the weight taken (pass it to release). Raises
+        AdmissionRejected when the queue is full or the wait runs out.
+        """
+        # A request heavier than the whole capacity would never fit
+        weight = min(weight, self.capacity)
+        with self._cond:
+            # Only admit past the queue when nobody is waiting, so heavy requests are not starved
+            if not self._waiting and self.in_use + weight <= self.capacity:
+                self.in_use += weight
+                self.admitted += 1
+                return weight
+            if len(self._waiting) >= self.max_queue:
+                self.rejected += 1
+                raise AdmissionRejected('queue_full')
+
+            ticket = object()
+            self._waiting.append(ticket)
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while self._waiting[0] is not ticket or self.in_use + weight > self.capacity:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise AdmissionRejected('timeout')
+                    self._cond.wait(remaining)
+                self.in_use += weight
+                self.admitted += 1
+                return weight
+            finally:
+                self._waiting.remove(ticket)
+                # The next in line may fit now (or may be first in line now)
+                self._cond.notify_all()
+
+    def release(self, weight):
+        with self._cond:
+            self.in_use -= weight
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'capacity': self.capacity,
+                'in_use': self.in_use,
+                'waiting': len(self._waiting),
+                'max_queue': self.max_queue,
+                'max_wait': self.max_wait,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+            }
@@ -1,10 +1,14 @@
-from flask import Flask, render_template, request, jsonify, Response
+from flask import Flask, render_template, request, jsonify, Response, g
 import logging
 import os
 import sys
 from datetime import datetime
 import csv
 import io
+import threading
+import time
+from sqlalchemy import text, func
+from sqlalchemy.exc import IntegrityError
 
 # Add backend directory to path for imports
 backend_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,6 +21,17 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 from tictactoe_ai import TicTacToeAI
+from mnk_engine import MNKEngine, MIN_SIZE, MAX_SIZE
+from mcts import MCTSEngine
+from tablebase import load_or_build_tablebase
+from move_pool import solve_batch, DEFAULT_WORKERS as MOVE_POOL_WORKERS
+from job_queue import JobQueue, JobQueueFull, DONE, FAILED
+from search_stats import SearchStats, StatsTotals
+import metrics
+from sessions import SessionStore, GameSession
+from cache import LRUCache
+from admission import AdmissionController, AdmissionRejected, WEIGHTS
+from bitboard import board_to_bits, bits_to_board, string_to_bits, bits_to_string, popcount
 from database.db import init_db, get_db_session
 from database.models import Game, Move
 
@@ -31,7 +46,282 @@ app = Flask(__name__,
             template_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend', 'templates'),
             static_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend', 'static'))
 
-game_ai = TicTacToeAI()
+# Shared AI instance; its transposition table stays warm across /move requests
+game_ai = TicTacToeAI(tt_max_entries=int(os.environ.get('TT_MAX_ENTRIES', 100000)),
+                      memo_max_entries=int(os.environ.get('MEMO_MAX_ENTRIES', 100000)))
+# Hard mode answers from the precomputed tablebase (rebuilt if missing or stale)
+game_ai.tablebase = load_or_build_tablebase()
+
+# Engines for boards other than the classic 3x3, one per (rows, cols, k)
+mnk_engines = {}
+
+# Their hard searches run root-parallel on the move pool (default: on when
+# the pool has more than one worker process)
+PARALLEL_SEARCH = os.environ.get('PARALLEL_SEARCH', '1' if MOVE_POOL_WORKERS > 1 else '0').lower() in ('1', 'true', 'yes')
+
+# Monte Carlo Tree Search engines (the 'mcts' difficulty), one per (rows, cols, k)
+mcts_engines = {}
+
+DIFFICULTIES = ['easy', 'medium', 'hard', 'mcts']
+
+# Upper bound on the playout budget a client may request
+MAX_MCTS_PLAYOUTS = int(os.environ.get('MCTS_MAX_PLAYOUTS', 20000))
+
+# Most items accepted by one /move_batch request
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 10000))
+
+# Asynchronous move jobs, run on the same worker processes as /move_batch
+move_jobs = JobQueue()
+
+# Longest a GET /move_jobs/<id> request may wait for its job to finish
+MAX_JOB_WAIT = float(os.environ.get('MAX_JOB_WAIT', 30))
+
+# Longest search a /move request may ask for, and the time kept back from a
+# deadline for everything around the search (parsing, response, logging)
+MAX_TIME_BUDGET_MS = float(os.environ.get('MAX_TIME_BUDGET_MS', 10000))
+DEADLINE_MARGIN_MS = float(os.environ.get('DEADLINE_MARGIN_MS', 5))
+
+# Hard mode is deterministic, so its completed /move answers are kept per
+# (size, board, side, difficulty) and served again without a search
+move_cache = LRUCache(int(os.environ.get('MOVE_CACHE_MAX_ENTRIES', 100000)))
+DETERMINISTIC_DIFFICULTIES = ('hard',)
+
+# How long clients and proxies may reuse a cacheable /move response (seconds)
+MOVE_CACHE_MAX_AGE = int(os.environ.get('MOVE_CACHE_MAX_AGE', 86400))
+
+# Limits the AI searches running at once (/move, /play, /move_batch); requests
+# past the capacity and its short wait queue get a quick 503 with Retry-After
+move_admission = AdmissionController()
+ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', 1))  # seconds
+
+# Extra board sizes whose engines warm_up() builds ahead of the first request
+# (e.g. "7x7x5,9x9x5"; 3x3 is always ready), and how many plies of 3x3
+# openings it puts into the result cache
+WARM_BOARD_SIZES = os.environ.get('WARM_BOARD_SIZES', '')
+WARM_OPENING_PLIES = int(os.environ.get('WARM_OPENING_PLIES', 2))
+warmed_up = threading.Event()
+_warm_up_lock = threading.Lock()
+
+# Boards of active games, so /play, /move and /check_game_state can take just a game_id
+game_sessions = SessionStore()
+
+# Search statistics summed per difficulty over the /move searches that collected them
+# (those that asked for ?stats=1, or all of them when SEARCH_STATS=1)
+search_totals = StatsTotals()
+ALWAYS_COLLECT_STATS = os.environ.get('SEARCH_STATS', '0').lower() in ('1', 'true', 'yes')
+
+def busy_response(message):
+    """503 telling the client when to retry"""
+    response = jsonify({'error': message})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(ADMISSION_RETRY_AFTER)
+    return response
+
+def admit(weight):
+    """
+    Takes AI capacity for the rest of the request (released on teardown).
+    Returns a 503 response when the server is saturated, otherwise None
+    """
+    try:
+        g.admission_weight = move_admission.acquire(weight)
+    except AdmissionRejected as e:
+        print(f"Admission rejected on {g.metrics_route}: {e.reason}")
+        metrics.admission_rejected(g.metrics_route, e.reason)
+        return busy_response(str(e))
+    return None
+
+def wants_stats(data):
+    """True when the /move request asks for search statistics (?stats=1 or "stats": true)"""
+    return request.args.get('stats', '0').lower() in ('1', 'true', 'yes') or data.get('stats') is True
+
+def get_game_id(value):
+    """Game ids arrive as JSON numbers or strings; the session store keys them as ints"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError('game_id must be an integer')
+
+def load_session(game_id):
+    """
+    Session of an ongoing game, checked against the database on every call:
+    another worker (or /log_move) may have played turns this process has not
+    seen, so a session whose move count differs from the moves table is
+    rebuilt from it. Returns (session, game): session is None when the game
+    is unknown (game None) or over (game has its result)
+    """
+    db = get_db_session()
+    try:
+        game = (db.query(Game.result, func.count(Move.id).label('move_count'),
+                         func.max(Move.move_number).label('last_move_number'))
+                .outerjoin(Move, Move.game_id == Game.id)
+                .filter(Game.id == game_id)
+                .group_by(Game.id)
+                .first())
+        if game is None or game.result != 'ongoing':
+            game_sessions.discard(game_id)
+            return None, game
+        session = game_sessions.get(game_id)
+        if session is not None and session.move_count == game.move_count == (game.last_move_number or 0):
+            return session, game
+        row = db.query(Game).filter(Game.id == game_id).first()
+        moves = db.query(Move).filter(Move.game_id == game_id).order_by(Move.move_number).all()
+        session = GameSession.from_game(row, moves)
+    finally:
+        db.close()
+    game_sessions.put(game_id, session)
+    return session, game
+
+def session_error(game):
+    """Response for a game_id without a session: unknown game or finished game"""
+    if game is None:
+        return jsonify({'error': 'Game not found'}), 404
+    return jsonify({'error': 'Game is already over', 'result': game.result}), 409
+
+def get_dimensions(data):
+    """Read rows/cols/k from a request body (defaults to 3x3 with 3 in a row)"""
+    try:
+        rows = int(data.get('rows', 3))
+        cols = int(data.get('cols', 3))
+        k = int(data.get('k', 3))
+    except (TypeError, ValueError):
+        raise ValueError('rows, cols and k must be integers')
+    if not (MIN_SIZE <= rows <= MAX_SIZE and MIN_SIZE <= cols <= MAX_SIZE):
+        raise ValueError(f'rows and cols must be between {MIN_SIZE} and {MAX_SIZE}')
+    if not (MIN_SIZE <= k <= max(rows, cols)):
+        raise ValueError(f'k must be between {MIN_SIZE} and {max(rows, cols)}')
+    return rows, cols, k
+
+def get_engine(rows, cols, k):
+    """Return the AI for a board size: the shared game_ai for 3x3, otherwise an MNKEngine"""
+    if (rows, cols, k) == (3, 3, 3):
+        return game_ai
+    engine = mnk_engines.get((rows, cols, k))
+    if engine is None:
+        engine = mnk_engines.setdefault((rows, cols, k), MNKEngine(rows, cols, k, parallel=PARALLEL_SEARCH))
+    return engine
+
+def get_mcts_engine(rows, cols, k):
+    """Return the MCTS engine for a board size (it keeps the search trees of ongoing games)"""
+    engine = mcts_engines.get((rows, cols, k))
+    if engine is None:
+        engine = mcts_engines.setdefault((rows, cols, k), MCTSEngine(rows, cols, k))
+    return engine
+
+def get_playouts(data):
+    """Read the optional MCTS playout budget from a request body"""
+    playouts = data.get('playouts')
+    if playouts is None:
+        return None
+    try:
+        playouts = int(playouts)
+    except (TypeError, ValueError):
+        raise ValueError('playouts must be an integer')
+    if not (1 <= playouts <= MAX_MCTS_PLAYOUTS):
+        raise ValueError(f'playouts must be between 1 and {MAX_MCTS_PLAYOUTS}')
+    return playouts
+
+def get_time_budget(data, started, fields=('time_budget_ms', 'deadline_ms')):
+    """
+    Read the search time budget in seconds from time_budget_ms (search time) or
+    deadline_ms (whole request, counted from started); None when neither is given
+    """
+    budgets = []
+    for field in fields:
+        value = data.get(field)
+        if value is None:
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{field} must be a number')
+        if not (0 < value <= MAX_TIME_BUDGET_MS):
+            raise ValueError(f'{field} must be between 0 and {MAX_TIME_BUDGET_MS:g}')
+        if field == 'deadline_ms':
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            value -= elapsed_ms + DEADLINE_MARGIN_MS
+        budgets.append(value)
+    if not budgets:
+        return None
+    # A search always gets a moment to produce its best-so-far move
+    return max(min(budgets), 1) / 1000
+
+def is_valid_board(board, rows, cols):
+    """Check the board is a rows x cols list of lists"""
+    if not isinstance(board, list) or len(board) != rows:
+        return False
+    return all(isinstance(row, list) and len(row) == cols for row in board)
+
+BOARD_FORMATS = ('list', 'string', 'bits')
+
+def is_bits_pair(value):
+    """True for an [x_bits, o_bits] board (JSON booleans are not bitmasks)"""
+    return (isinstance(value, list) and len(value) == 2
+            and all(isinstance(bits, int) and not isinstance(bits, bool) for bits in value))
+
+def read_board(value, rows, cols, to_move=None):
+    """
+    Board from a request in any wire format, as nested lists with ' ' for empty:
+    - nested lists with '' or ' ' for empty cells (checked for shape only)
+    - a string of rows * cols cells row by row, e.g. "X..O....."
+    - an [x_bits, o_bits] pair of bitmasks, bit row * cols + col per cell
+    The compact forms are also checked for legal piece counts (X moves first)
+    and, when to_move is given, that it is that side's turn. Raises ValueError
+    """
+    if isinstance(value, str):
+        x_bits, o_bits = string_to_bits(value, rows, cols)
+    elif is_bits_pair(value):
+        x_bits, o_bits = value
+        if not (0 <= x_bits < 1 << (rows * cols) and 0 <= o_bits < 1 << (rows * cols)):
+            raise ValueError(f'board bitmasks must be between 0 and 2**{rows * cols} - 1')
+        if x_bits & o_bits:
+            raise ValueError('board bitmasks overlap')
+    else:
+        board = normalize_board(value)
+        if not is_valid_board(board, rows, cols):
+            raise ValueError('Invalid board structure')
+        return board
+    
+    x_count, o_count = popcount(x_bits), popcount(o_bits)
+    if x_count - o_count not in (0, 1):
+        raise ValueError(f'Illegal position: {x_count} X and {o_count} O (X moves first)')
+    turn = 'X' if x_count == o_count else 'O'
+    if to_move is not None and to_move != turn:
+        raise ValueError(f'Not {to_move} to move: it is {turn}\'s turn')
+    return bits_to_board(x_bits, o_bits, rows, cols)
+
+def get_board_format(data):
+    """Wire format for boards in the response: list (default), string or bits"""
+    board_format = data.get('board_format', 'list')
+    if board_format not in BOARD_FORMATS:
+        raise ValueError(f"board_format must be one of {', '.join(BOARD_FORMATS)}")
+    return board_format
+
+def format_board(board, board_format):
+    """Board (nested lists, ' ' for empty) in a response wire format"""
+    if board_format == 'string':
+        return bits_to_string(*board_to_bits(board), len(board), len(board[0]))
+    if board_format == 'bits':
+        return list(board_to_bits(board))
+    # Denormalize for frontend (space -> empty string)
+    return denormalize_board(board)
+
+def move_cache_key(board, ai_player, difficulty, rows, cols, k):
+    """Result cache key: the position as bitboards, so '' and ' ' boards share an entry"""
+    x_bits, o_bits = board_to_bits(board)
+    return (rows, cols, k, x_bits, o_bits, ai_player, difficulty)
+
+def cache_headers(response, cacheable):
+    """
+    Deterministic answers get an ETag and a public max-age (a repeat GET with
+    If-None-Match gets a 304); randomized ones are marked no-store
+    """
+    if not cacheable:
+        response.cache_control.no_store = True
+        return response
+    response.cache_control.public = True
+    response.cache_control.max_age = MOVE_CACHE_MAX_AGE
+    response.add_etag()
+    return response.make_conditional(request)
 
 def normalize_board(board):
     """Convert empty strings to spaces for backend compatibility"""
@@ -57,6 +347,36 @@ def denormalize_board(board):
             denormalized.append(row)
     return denormalized
 
+def metrics_route():
+    """Route label for metrics: the URL rule, so ids in the path do not create new series"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    g.metrics_route = metrics_route()
+    metrics.request_started(g.metrics_route)
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('metrics_started')
+    if started is not None:
+        metrics.request_finished(g.metrics_route, request.method, response.status_code,
+                                 g.get('metrics_difficulty'), time.perf_counter() - started)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exception=None):
+    # Runs even when the request failed, so the in-flight gauge always goes back down
+    if g.get('metrics_started') is not None:
+        metrics.request_closed(g.metrics_route)
+
+@app.teardown_request
+def release_admission(exception=None):
+    weight = g.pop('admission_weight', None)
+    if weight is not None:
+        move_admission.release(weight)
+
 @app.after_request
 def set_headers(response):
     """Set headers to disable CSP for development"""
@@ -64,47 +384,157 @@ def set_headers(response):
     response.headers['X-Content-Type-Options'] = 'nosniff'
     return response
 
+def warm_opening_cache(plies):
+    """Puts the hard answers for every 3x3 position with up to plies pieces into move_cache"""
+    positions = 0
+    frontier = {(0, 0)}
+    for ply in range(plies + 1):
+        ai_player = 'X' if ply % 2 == 0 else 'O'
+        next_frontier = set()
+        for x_bits, o_bits in frontier:
+            board = bits_to_board(x_bits, o_bits)
+            if game_ai.check_winner(board):
+                continue
+            result = game_ai.get_best_move_result(board, ai_player, 'hard')
+            if result.move is None:
+                continue
+            move_cache.put(move_cache_key(board, ai_player, 'hard', 3, 3, 3), move_response(result, ai_player))
+            positions += 1
+            for i in range(9):
+                bit = 1 << i
+                if not (x_bits | o_bits) & bit:
+                    next_frontier.add((x_bits | bit, o_bits) if ai_player == 'X' else (x_bits, o_bits | bit))
+        frontier = next_frontier
+    return positions
+
+def warm_up():
+    """
+    Builds the read-only AI structures before the first request: engines and
+    line tables for WARM_BOARD_SIZES, the 3x3 opening answers and the page
+    template. wsgi.py runs it at import, so under gunicorn with preload_app
+    it runs once in the master and the forked workers share the result.
+    Runs only once; /ready reports ready after it
+    """
+    with _warm_up_lock:
+        if warmed_up.is_set():
+            return
+        started = time.perf_counter()
+        for size in filter(None, (size.strip() for size in WARM_BOARD_SIZES.split(','))):
+            rows, cols, k = get_dimensions(dict(zip(('rows', 'cols', 'k'), size.lower().split('x'))))
+            get_engine(rows, cols, k)
+            get_mcts_engine(rows, cols, k)
+        positions = warm_opening_cache(WARM_OPENING_PLIES)
+        app.jinja_env.get_template('index.html')
+        warmed_up.set()
+        print(f"Warm-up done in {(time.perf_counter() - started) * 1000:.0f} ms "
+              f"({positions} opening positions cached)")
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/move', methods=['POST'])
+@app.route('/move', methods=['GET', 'POST'])
 def make_move():
+    started = time.perf_counter()
     try:
-        data = request.json
-        board = data['board']
+        if request.method == 'GET':
+            # Same fields as the JSON body, with the board as a string, so
+            # browsers and reverse proxies can cache the URL
+            data = request.args.to_dict()
+        else:
+            data = request.json
+        session = None
+        if 'board' not in data and data.get('game_id') is not None:
+            # A game the server tracks: board, size and symbols come from its session
+            try:
+                session, game = load_session(get_game_id(data['game_id']))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            if session is None:
+                return session_error(game)
+            data = dict(data, rows=session.rows, cols=session.cols, k=session.k)
+            data.setdefault('ai_player', session.ai_symbol)
+            data.setdefault('difficulty', session.difficulty)
+        
         ai_player = data.get('ai_player', 'O')
         difficulty = data.get('difficulty', 'hard').lower()
         
         # Validate difficulty
-        if difficulty not in ['easy', 'medium', 'hard']:
+        if difficulty not in DIFFICULTIES:
             difficulty = 'hard'  # Default to hard if invalid
+        g.metrics_difficulty = difficulty
         
-        # Normalize board (empty string -> space)
-        board = normalize_board(board)
+        try:
+            rows, cols, k = get_dimensions(data)
+            playouts = get_playouts(data)
+            time_budget = get_time_budget(data, started)
+            # Same int key as /play, so both routes continue the same MCTS tree
+            game_id = get_game_id(data['game_id']) if data.get('game_id') is not None else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if session is not None:
+            board = session.board()
+        else:
+            try:
+                board = read_board(data.get('board'), rows, cols, to_move=ai_player)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
         
         print("=== AI MOVE REQUEST ===")
         print(f"Board received: {board}")
         print(f"AI playing as: {ai_player}")
         print(f"Difficulty: {difficulty}")
-        
-        # Validate board structure
-        if not isinstance(board, list) or len(board) != 3:
-            return jsonify({'error': 'Invalid board structure'}), 400
             
+        # Statistics are only collected when needed (the plain search has no counters)
+        show_stats = wants_stats(data)
+        stats = SearchStats() if show_stats or ALWAYS_COLLECT_STATS else None
+        
+        # A repeat hard position is answered from the result cache, unless the
+        # client wants the statistics of a real search
+        cache_key = None
+        if difficulty in DETERMINISTIC_DIFFICULTIES and not show_stats:
+            cache_key = move_cache_key(board, ai_player, difficulty, rows, cols, k)
+            response = move_cache.get(cache_key)
+            if response is not None:
+                print(f"AI responding from result cache: {response}")
+                return cache_headers(jsonify(response), session is None)
+        
+        rejected = admit(WEIGHTS.get(difficulty, 1))
+        if rejected is not None:
+            return rejected
+        # Time spent waiting for admission counts against deadline_ms
+        time_budget = get_time_budget(data, started)
+        
         # Get the best move from AI based on difficulty
         print(f"Calling get_best_move with difficulty: {difficulty}...")
-        move = game_ai.get_best_move(board, ai_player, difficulty)
-        print(f"AI move result: {move}")
+        if difficulty == 'mcts':
+            # game_id lets the engine continue from the tree of the previous move
+            engine = get_mcts_engine(rows, cols, k)
+            result = engine.get_best_move_result(board, ai_player, playouts=playouts, time_budget=time_budget,
+                                                 game_id=game_id, stats=stats)
+        else:
+            # Searches are anytime: when the budget runs out the best move so far is returned
+            engine = get_engine(rows, cols, k)
+            result = engine.get_best_move_result(board, ai_player, difficulty, time_budget, stats=stats)
+        move = result.move
+        print(f"AI move result: {move} (depth {result.depth}, completed: {result.completed})")
+        if stats is not None:
+            search_totals.record(difficulty, stats)
+            print(f"Search stats: {stats.as_dict()}")
         
         if move:
-            response = {
-                'row': move[0],
-                'col': move[1],
-                'player': ai_player
-            }
+            response = move_response(result, ai_player)
+            # Only a finished search is the same every time; one cut short by its
+            # time budget depends on how far it got
+            cacheable = cache_key is not None and result.completed
+            if cacheable:
+                move_cache.put(cache_key, response)
+            if show_stats:
+                response = dict(response, stats=stats.as_dict())
             print(f"AI responding with: {response}")
-            return jsonify(response)
+            # Answers for a game_id depend on server state, so they stay private to this request
+            return cache_headers(jsonify(response), cacheable and session is None)
         else:
             print("No moves available - board might be full")
             return jsonify({'error': 'No moves available'}), 400
@@ -115,20 +545,166 @@ def make_move():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+def parse_batch_item(item):
+    """Validate one /move_batch or /move_jobs item; returns a move_pool task or raises ValueError"""
+    if not isinstance(item, dict) or 'board' not in item:
+        raise ValueError('Each item must be an object with a board')
+    ai_player = item.get('ai_player', 'O')
+    difficulty = str(item.get('difficulty', 'hard')).lower()
+    if difficulty not in DIFFICULTIES:
+        difficulty = 'hard'  # Default to hard if invalid, like /move
+    rows, cols, k = get_dimensions(item)
+    playouts = get_playouts(item)
+    # Items run one after another on the pool, so only a per-search budget makes sense
+    time_budget = get_time_budget(item, None, fields=('time_budget_ms',))
+    board = read_board(item['board'], rows, cols, to_move=ai_player)
+    return (board, ai_player, difficulty, rows, cols, k, playouts, time_budget)
+
+def move_response(result, ai_player):
+    """JSON body for an engine result, as returned by /move"""
+    return {
+        'row': result.move[0],
+        'col': result.move[1],
+        'player': ai_player,
+        'depth': result.depth,
+        'completed': result.completed
+    }
+
+@app.route('/move_batch', methods=['POST'])
+def move_batch():
+    """AI moves for many boards at once, computed on the process pool"""
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('items')
+        if not isinstance(items, list):
+            return jsonify({'error': 'items must be a list'}), 400
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} items per batch'}), 400
+        
+        print(f"=== AI MOVE BATCH: {len(items)} items ===")
+        
+        # Validate here so only well-formed tasks go to the pool
+        results = [None] * len(items)
+        tasks = []
+        positions = []
+        for i, item in enumerate(items):
+            try:
+                tasks.append(parse_batch_item(item))
+                positions.append(i)
+            except ValueError as e:
+                results[i] = {'error': str(e)}
+        
+        if tasks:
+            # A batch takes at most half the capacity, so single moves still get through
+            weight = sum(WEIGHTS.get(task[2], 1) for task in tasks)
+            rejected = admit(min(weight, max(move_admission.capacity // 2, 1)))
+            if rejected is not None:
+                return rejected
+        
+        for i, task, (status, value) in zip(positions, tasks, solve_batch(tasks)):
+            if status == 'error':
+                results[i] = {'error': value}
+            elif value.move:
+                results[i] = move_response(value, task[1])
+            else:
+                results[i] = {'error': 'No moves available'}
+        
+        errors = sum(1 for result in results if 'error' in result)
+        print(f"Batch done: {len(items) - errors} moves, {errors} errors")
+        return jsonify({'results': results, 'count': len(results), 'errors': errors})
+        
+    except Exception as e:
+        print(f"ERROR in move_batch: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+def job_response(job):
+    """JSON body describing a move job"""
+    response = {'job_id': job.id, 'status': job.status}
+    if job.status == DONE:
+        if job.result.move:
+            response['result'] = move_response(job.result, job.task[1])
+        else:
+            response['error'] = 'No moves available'
+    elif job.status == FAILED:
+        response['error'] = job.error
+    return response
+
+@app.route('/move_jobs', methods=['POST'])
+def submit_move_job():
+    """Queue an AI move; returns a job id at once"""
+    try:
+        data = request.get_json(silent=True)
+        try:
+            task = parse_batch_item(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        try:
+            job = move_jobs.submit(task)
+        except JobQueueFull as e:
+            return busy_response(str(e))
+        
+        print(f"Queued move job {job.id} ({move_jobs.depth()} waiting)")
+        response = job_response(job)
+        response['queue_depth'] = move_jobs.depth()
+        return jsonify(response), 202
+        
+    except Exception as e:
+        print(f"ERROR in submit_move_job: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/move_jobs/<job_id>', methods=['GET'])
+def get_move_job(job_id):
+    """Job status and result; ?wait=<seconds> long-polls until the job finishes"""
+    try:
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        return jsonify({'error': 'wait must be a number of seconds'}), 400
+    job = move_jobs.wait(job_id, min(max(wait, 0), MAX_JOB_WAIT))
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_response(job))
+
+@app.route('/move_jobs/<job_id>', methods=['DELETE'])
+def cancel_move_job(job_id):
+    """Cancel a queued or running job"""
+    job = move_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    print(f"Move job {job_id}: {job.status}")
+    return jsonify(job_response(job))
+
 @app.route('/check_game_state', methods=['POST'])
 def check_game_state():
     try:
         data = request.json
-        board = data['board']
-        
-        # Normalize board (empty string -> space)
-        board = normalize_board(board)
+        if 'board' not in data and data.get('game_id') is not None:
+            # Board of a game the server tracks
+            try:
+                session, game = load_session(get_game_id(data['game_id']))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            if session is None:
+                return session_error(game)
+            rows, cols, k = session.rows, session.cols, session.k
+            board = session.board()
+        else:
+            try:
+                rows, cols, k = get_dimensions(data)
+                board = read_board(data.get('board'), rows, cols)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
         
         print("=== CHECKING GAME STATE ===")
         print(f"Board: {board}")
         
-        winner = game_ai.check_winner(board)
-        is_full = game_ai.is_board_full(board)
+        engine = get_engine(rows, cols, k)
+        winner = engine.check_winner(board)
+        is_full = engine.is_board_full(board)
         
         print(f"Winner: {winner}, Is full: {is_full}")
         
@@ -154,10 +730,14 @@ def check_game_state():
 @app.route('/reset', methods=['POST'])
 def reset_game():
     """Returns an empty board"""
-    empty_board = game_ai.create_board()
-    # Denormalize for frontend (space -> empty string)
-    empty_board = denormalize_board(empty_board)
-    return jsonify({'board': empty_board})
+    data = request.get_json(silent=True) or {}
+    try:
+        rows, cols, k = get_dimensions(data)
+        board_format = get_board_format(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    empty_board = get_engine(rows, cols, k).create_board()
+    return jsonify({'board': format_board(empty_board, board_format)})
 
 @app.route('/start_game', methods=['POST'])
 def start_game():
@@ -169,8 +749,14 @@ def start_game():
         difficulty = data.get('difficulty', 'hard').lower()
         
         # Validate difficulty
-        if difficulty not in ['easy', 'medium', 'hard']:
+        if difficulty not in DIFFICULTIES:
             difficulty = 'hard'
+        g.metrics_difficulty = difficulty
+        
+        try:
+            rows, cols, k = get_dimensions(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Create new game in database
         db = get_db_session()
@@ -179,15 +765,23 @@ def start_game():
                 player_symbol=player_symbol,
                 ai_symbol=ai_symbol,
                 difficulty=difficulty,
+                rows=rows,
+                cols=cols,
+                k=k,
                 result='ongoing'  # Will be updated when game ends
             )
             db.add(game)
-            db.commit()
+            with metrics.commit_timer('start_game'):
+                db.commit()
             db.refresh(game)
             game_id = game.id
+            game_sessions.put(game_id, GameSession(game_id, rows, cols, k, player_symbol, ai_symbol, difficulty))
             
             return jsonify({
                 'game_id': game_id,
+                'rows': rows,
+                'cols': cols,
+                'k': k,
                 'status': 'success'
             })
         finally:
@@ -226,7 +820,17 @@ def log_move():
                 is_ai_move=1 if is_ai_move else 0
             )
             db.add(move)
-            db.commit()
+            try:
+                with metrics.commit_timer('log_move'):
+                    db.commit()
+            except IntegrityError:
+                db.rollback()
+                return jsonify({'error': f'Move {move_number} of game {game_id} is already logged'}), 409
+            # Moves logged one at a time bypass the session; rebuild it on next use
+            try:
+                game_sessions.discard(get_game_id(game_id))
+            except ValueError:
+                pass
             
             return jsonify({
                 'status': 'success',
@@ -241,6 +845,150 @@ def log_move():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+def game_result(winner, player_symbol):
+    """Result from the player's point of view: 'win', 'loss' or 'tie'"""
+    if winner is None:
+        return 'tie'
+    if winner == player_symbol:
+        return 'win'
+    return 'loss'
+
+def parse_cell(data, rows, cols):
+    """Read the player's move (row, col) from a /play body; None when it has no move"""
+    row = data.get('row')
+    col = data.get('col')
+    if row is None and col is None:
+        return None
+    if not (isinstance(row, int) and isinstance(col, int)) or isinstance(row, bool) or isinstance(col, bool):
+        raise ValueError('row and col must be integers')
+    if not (0 <= row < rows and 0 <= col < cols):
+        raise ValueError(f'row must be between 0 and {rows - 1} and col between 0 and {cols - 1}')
+    return row, col
+
+@app.route('/play', methods=['POST'])
+def play():
+    """
+    One turn in one request: validates the player's move against the game's
+    session, computes the AI reply, logs both moves in a single commit and
+    finishes the game when it is over. Without a move, the AI moves (e.g. when it plays X)
+    """
+    started = time.perf_counter()
+    try:
+        data = request.get_json(silent=True) or {}
+        if data.get('game_id') is None:
+            return jsonify({'error': 'Missing game_id'}), 400
+        try:
+            session, game = load_session(get_game_id(data['game_id']))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if session is None:
+            return session_error(game)
+        g.metrics_difficulty = session.difficulty
+        
+        rows, cols, k = session.rows, session.cols, session.k
+        try:
+            cell = parse_cell(data, rows, cols)
+            board_format = get_board_format(data)
+            playouts = get_playouts(data)
+            time_budget = get_time_budget(data, started)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        rejected = admit(WEIGHTS.get(session.difficulty, 1))
+        if rejected is not None:
+            return rejected
+        time_budget = get_time_budget(data, started)
+        
+        # One turn of a game at a time; the session changes only after the commit
+        with session.lock:
+            engine = get_engine(rows, cols, k)
+            board = session.board()
+            if engine.get_game_state(board) is not None:
+                # Finished by a request that held the lock before this one
+                return jsonify({'error': 'Game is already over'}), 409
+            move_number = session.move_count
+            turn = session.turn
+            
+            print(f"=== PLAY: game {session.game_id}, move {cell}, {turn} to move ===")
+            
+            new_moves = []
+            player_move = None
+            if cell is not None:
+                if turn != session.player_symbol:
+                    return jsonify({'error': 'Not your turn'}), 409
+                if not session.is_empty(*cell):
+                    return jsonify({'error': 'Cell is already taken'}), 400
+                board[cell[0]][cell[1]] = turn
+                new_moves.append((cell[0], cell[1], turn, 0))
+                player_move = {'row': cell[0], 'col': cell[1], 'player': turn}
+            elif turn != session.ai_symbol:
+                return jsonify({'error': 'row and col are required on your turn'}), 400
+            
+            ai_move = None
+            state = engine.get_game_state(board)
+            if state is None:
+                if session.difficulty == 'mcts':
+                    result = get_mcts_engine(rows, cols, k).get_best_move_result(
+                        board, session.ai_symbol, playouts=playouts, time_budget=time_budget,
+                        game_id=session.game_id)
+                else:
+                    result = engine.get_best_move_result(board, session.ai_symbol, session.difficulty, time_budget)
+                row, col = result.move
+                board[row][col] = session.ai_symbol
+                new_moves.append((row, col, session.ai_symbol, 1))
+                ai_move = move_response(result, session.ai_symbol)
+                state = engine.get_game_state(board)
+            
+            result_name = winner = None
+            db = get_db_session()
+            try:
+                for row, col, player, is_ai_move in new_moves:
+                    move_number += 1
+                    db.add(Move(game_id=session.game_id, move_number=move_number, row=row, col=col,
+                                player=player, is_ai_move=is_ai_move))
+                if state is not None:
+                    winner = None if state == 'tie' else state
+                    result_name = game_result(winner, session.player_symbol)
+                    db.query(Game).filter(Game.id == session.game_id).update(
+                        {'result': result_name, 'winner': winner})
+                
+                # Both moves and the result are written together
+                with metrics.commit_timer('play'):
+                    db.commit()
+            except IntegrityError:
+                # Another worker stored this turn first; the next request rebuilds the session
+                db.rollback()
+                game_sessions.discard(session.game_id)
+                return jsonify({'error': 'The game was changed by another request, try again'}), 409
+            finally:
+                db.close()
+            
+            for row, col, player, _ in new_moves:
+                session.apply(row, col, player)
+        
+        if state is not None:
+            game_sessions.discard(session.game_id)
+            for mcts_engine in list(mcts_engines.values()):
+                mcts_engine.forget(session.game_id)
+        
+        print(f"Play done: AI move {ai_move}, state {state or 'ongoing'}")
+        return jsonify({
+            'game_id': session.game_id,
+            'player_move': player_move,
+            'ai_move': ai_move,
+            'board': format_board(board, board_format),
+            'move_number': move_number,
+            'game_state': state or 'ongoing',
+            'result': result_name,
+            'winner': winner
+        })
+        
+    except Exception as e:
+        print(f"ERROR in play: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/end_game', methods=['POST'])
 def end_game():
     """Log game completion with result"""
@@ -254,12 +1002,7 @@ def end_game():
             return jsonify({'error': 'Missing game_id'}), 400
         
         # Determine result from winner and player_symbol
-        if winner is None:
-            result = 'tie'
-        elif winner == player_symbol:
-            result = 'win'
-        else:
-            result = 'loss'
+        result = game_result(winner, player_symbol)
         
         # Update game in database
         db = get_db_session()
@@ -268,7 +1011,13 @@ def end_game():
             if game:
                 game.result = result
                 game.winner = winner
-                db.commit()
+                with metrics.commit_timer('end_game'):
+                    db.commit()
+                game_sessions.discard(game.id)
+                
+                # The MCTS tree of a finished game will not be reused
+                for engine in list(mcts_engines.values()):
+                    engine.forget(game.id)
                 
                 return jsonify({
                     'status': 'success',
@@ -306,6 +1055,9 @@ def get_game_history():
                     'difficulty': game.difficulty,
                     'result': game.result,
                     'winner': game.winner,
+                    'rows': game.rows or 3,
+                    'cols': game.cols or 3,
+                    'k': game.k or 3,
                     'created_at': game.created_at.isoformat() if game.created_at else None,
                     'moves': [
                         {
@@ -411,6 +1163,9 @@ def export_game_history():
                         'difficulty': game.difficulty,
                         'result': game.result,
                         'winner': game.winner,
+                        'rows': game.rows or 3,
+                        'cols': game.cols or 3,
+                        'k': game.k or 3,
                         'created_at': game.created_at.isoformat() if game.created_at else None,
                         'moves': [
                             {
@@ -452,11 +1207,47 @@ def debug_ai():
         'test_board': test_board,
         'ai_move': move,
         'winner': game_ai.check_winner(test_board),
-        'possible_moves': game_ai.get_possible_moves(test_board)
+        'possible_moves': game_ai.get_possible_moves(test_board),
+        'caches': {
+            'transposition_table': game_ai.transposition_table.stats(),
+            'dfs_memo': game_ai.dfs_memo.stats(),
+            'heuristic_memo': game_ai.heuristic_memo.stats(),
+            'game_sessions': game_sessions.stats(),
+            'move_cache': move_cache.stats()
+        },
+        'search_stats': search_totals.snapshot(),
+        'admission': move_admission.stats()
     })
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of the request, latency and DB metrics"""
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 once warm-up has finished and the database answers, 503 before"""
+    if not warmed_up.is_set():
+        return jsonify({'status': 'warming_up'}), 503
+    db = get_db_session()
+    try:
+        db.execute(text('SELECT 1'))
+    except Exception as e:
+        print(f"ERROR in ready: {str(e)}")
+        return jsonify({'status': 'database_unavailable', 'error': str(e)}), 503
+    finally:
+        db.close()
+    return jsonify({'status': 'ready', 'pid': os.getpid()})
+
+@app.route('/search_stats', methods=['GET'])
+def get_search_stats():
+    """Search statistics summed per difficulty since the server started"""
+    return jsonify({'difficulties': search_totals.snapshot(), 'always_collected': ALWAYS_COLLECT_STATS})
+
 if __name__ == '__main__':
     # Get port from environment variable or default to 5001
     port = int(os.environ.get('PORT', 5001))
+    warm_up()
     # Enable debug mode for auto-reload of templates and static files
     app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
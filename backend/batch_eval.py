@@ -0,0 +1,253 @@
+"""
+Vectorized evaluation of many 3x3 boards at once (NumPy).
+
+Boards are int8 arrays of shape (N, 3, 3) or (N, 9) with EMPTY = 0, X = 1 and
+O = 2. Every line is read through the precomputed LINE_INDEX matrix and turned
+into a base-3 code (0-26), so winners, terminal flags and heuristic scores are
+table lookups over an (N, 8) array instead of Python loops. Results match the
+scalar TicTacToeAI methods exactly:
+
+- winners()           -> check_winner (X is reported first, like the scalar code)
+- game_states()       -> get_game_state
+- legal_move_masks()  -> get_possible_moves
+- heuristic_scores()  -> advanced_heuristic_evaluate
+
+Usage: python backend/batch_eval.py [--count N] [--no-verify]
+"""
+
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from bitboard import CELLS, CENTER_MASK, CORNER_MASK, WIN_MASKS, MOVES, bits_to_board
+from tictactoe_ai import TicTacToeAI, _LINE_SCORES, _CELL_SCORES
+
+EMPTY = 0
+X = 1
+O = 2
+PLAYER_CODES = {'X': X, 'O': O}
+
+# Game state codes returned by game_states()
+ONGOING = 0
+X_WINS = X
+O_WINS = O
+TIE = 3
+STATE_NAMES = (None, 'X', 'O', 'tie')
+
+# LINE_INDEX[line] holds the 3 cell indices of each winning line (WIN_MASKS order)
+LINE_INDEX = np.array([MOVES[line] for line in WIN_MASKS], dtype=np.intp)
+
+# Weights turning the 3 cells of a line into its base-3 code
+_LINE_WEIGHTS = np.array([9, 3, 1], dtype=np.int8)
+X_LINE = X * 13  # Code of a line holding three X
+O_LINE = O * 13
+
+# The heuristic's positional part only scores the center and the corners
+CENTER = MOVES[CENTER_MASK][0]
+CORNERS = np.array(MOVES[CORNER_MASK], dtype=np.intp)
+
+
+def _build_line_table():
+    """Heuristic value of every line code, by AI code (row 0 unused)."""
+    scores = np.zeros((3, 27), dtype=np.int16)
+    for code in range(27):
+        cells = (code // 9, code // 3 % 3, code % 3)
+        for ai, opp in ((X, O), (O, X)):
+            scores[ai, code] = _LINE_SCORES[cells.count(ai) * 4 + cells.count(opp)]
+    return scores
+
+
+def _build_cell_tables():
+    """Positional score of each cell value (EMPTY/X/O) on the center and on a corner, by AI code."""
+    center = np.zeros((3, 3), dtype=np.int16)
+    corner = np.zeros((3, 3), dtype=np.int16)
+    for ai, opp in ((X, O), (O, X)):
+        center[ai, ai], center[ai, opp] = _CELL_SCORES[0][CENTER], _CELL_SCORES[1][CENTER]
+        corner[ai, ai], corner[ai, opp] = _CELL_SCORES[0][CORNERS[0]], _CELL_SCORES[1][CORNERS[0]]
+    return center, corner
+
+
+_LINE_SCORE_TABLE = _build_line_table()
+_CENTER_TABLE, _CORNER_TABLE = _build_cell_tables()
+
+BatchEvaluation = namedtuple('BatchEvaluation', ['winners', 'states', 'terminal', 'legal', 'heuristic'])
+
+
+def encode_boards(boards):
+    """Converts list-of-lists boards ('X', 'O', ' ' or '') into an (N, 9) int8 array."""
+    out = np.zeros((len(boards), CELLS), dtype=np.int8)
+    for n, board in enumerate(boards):
+        i = 0
+        for row in board:
+            for cell in row:
+                code = PLAYER_CODES.get(cell)
+                if code:
+                    out[n, i] = code
+                i += 1
+    return out
+
+
+def as_flat(boards):
+    """Validates a batch of boards and returns it as an (N, 9) int8 array."""
+    boards = np.asarray(boards)
+    if boards.ndim == 3 and boards.shape[1:] == (3, 3):
+        boards = boards.reshape(len(boards), CELLS)
+    elif boards.ndim != 2 or boards.shape[1] != CELLS:
+        raise ValueError(f'boards must have shape (N, 3, 3) or (N, 9), got {boards.shape}')
+    if boards.dtype != np.int8:
+        if not np.issubdtype(boards.dtype, np.integer):
+            raise ValueError(f'boards must be an integer array, got {boards.dtype}')
+        boards = boards.astype(np.int8)
+    if boards.size and (boards.min() < EMPTY or boards.max() > O):
+        raise ValueError('board cells must be 0 (empty), 1 (X) or 2 (O)')
+    return boards
+
+
+def line_codes(flat):
+    """(N, 8) base-3 code of every line of every board (flat must be (N, 9) int8)."""
+    return flat[:, LINE_INDEX] @ _LINE_WEIGHTS
+
+
+def _winners(codes):
+    x_wins = (codes == X_LINE).any(axis=1)
+    o_wins = (codes == O_LINE).any(axis=1)
+    return np.where(x_wins, X, np.where(o_wins, O, EMPTY)).astype(np.int8)
+
+
+def _ai_codes(ai_player, count):
+    """ai_player as an X/O code, or an (N,) array of codes when it differs per board."""
+    if isinstance(ai_player, str):
+        if ai_player not in PLAYER_CODES:
+            raise ValueError("ai_player must be 'X' or 'O'")
+        return PLAYER_CODES[ai_player]
+    codes = np.asarray(ai_player)
+    if codes.dtype.kind in 'US':
+        codes = np.where(codes == 'X', X, np.where(codes == 'O', O, EMPTY))
+    codes = np.broadcast_to(codes, (count,)).astype(np.intp)
+    if count and not np.isin(codes, (X, O)).all():
+        raise ValueError("ai_player must be 'X' or 'O'")
+    return codes
+
+
+def _heuristic_for(flat, codes, ai):
+    """Heuristic scores of every board for a single AI code."""
+    score = _LINE_SCORE_TABLE[ai][codes].sum(axis=1, dtype=np.int32)
+    score += _CENTER_TABLE[ai][flat[:, CENTER]]
+    score += _CORNER_TABLE[ai][flat[:, CORNERS]].sum(axis=1, dtype=np.int32)
+    return score
+
+
+def _heuristic(flat, codes, ai):
+    if np.ndim(ai) == 0:
+        return _heuristic_for(flat, codes, ai)
+    # Mixed AI sides: score both ways and pick per board
+    return np.where(ai == X, _heuristic_for(flat, codes, X), _heuristic_for(flat, codes, O))
+
+
+def _states(win, full):
+    return np.where(win != EMPTY, win, np.where(full, TIE, ONGOING)).astype(np.int8)
+
+
+def winners(boards):
+    """(N,) int8: X or O for the winner (X first, like check_winner), EMPTY for none."""
+    return _winners(line_codes(as_flat(boards)))
+
+
+def legal_move_masks(boards):
+    """(N, 9) bool: True for every empty cell (row-major, like get_possible_moves)."""
+    return as_flat(boards) == EMPTY
+
+
+def terminal_flags(boards):
+    """(N,) bool: True when the board has a winner or is full."""
+    flat = as_flat(boards)
+    return (_winners(line_codes(flat)) != EMPTY) | (flat != EMPTY).all(axis=1)
+
+
+def game_states(boards):
+    """(N,) int8 of ONGOING, X_WINS, O_WINS or TIE (STATE_NAMES maps them to get_game_state)."""
+    flat = as_flat(boards)
+    return _states(_winners(line_codes(flat)), (flat != EMPTY).all(axis=1))
+
+
+def heuristic_scores(boards, ai_player='O'):
+    """(N,) int32 advanced_heuristic_evaluate scores; ai_player may be one value or one per board."""
+    flat = as_flat(boards)
+    return _heuristic(flat, line_codes(flat), _ai_codes(ai_player, len(flat)))
+
+
+def evaluate_batch(boards, ai_player='O'):
+    """Computes every result in one pass over the line codes; returns a BatchEvaluation."""
+    flat = as_flat(boards)
+    codes = line_codes(flat)
+    win = _winners(codes)
+    legal = flat == EMPTY
+    full = ~legal.any(axis=1)
+    terminal = (win != EMPTY) | full
+    states = _states(win, full)
+    heuristic = _heuristic(flat, codes, _ai_codes(ai_player, len(flat)))
+    return BatchEvaluation(win, states, terminal, legal, heuristic)
+
+
+def all_boards():
+    """Every one of the 3**9 ways to fill a board with EMPTY, X and O, as (19683, 9) int8."""
+    index = np.arange(3 ** CELLS)
+    return ((index[:, None] // 3 ** np.arange(CELLS)) % 3).astype(np.int8)
+
+
+def verify(ai=None):
+    """
+    Checks every result against the scalar TicTacToeAI methods on all 3**9 boards.
+    Returns a list of (board, check, batch_value, scalar_value) mismatches.
+    """
+    ai = ai or TicTacToeAI()
+    boards = all_boards()
+    mismatches = []
+    for ai_player in ('X', 'O'):
+        result = evaluate_batch(boards, ai_player)
+        for n, row in enumerate(boards):
+            x_bits = sum(1 << i for i in range(CELLS) if row[i] == X)
+            o_bits = sum(1 << i for i in range(CELLS) if row[i] == O)
+            board = bits_to_board(x_bits, o_bits)
+            checks = (
+                ('winner', STATE_NAMES[result.winners[n]], ai.check_winner(board)),
+                ('state', STATE_NAMES[result.states[n]], ai.get_game_state(board)),
+                ('terminal', bool(result.terminal[n]), ai.get_game_state(board) is not None),
+                ('legal', [divmod(int(i), 3) for i in np.flatnonzero(result.legal[n])],
+                 ai.get_possible_moves(board)),
+                ('heuristic', int(result.heuristic[n]), ai.advanced_heuristic_evaluate(board, ai_player)),
+            )
+            for check, batch_value, scalar_value in checks:
+                if batch_value != scalar_value:
+                    mismatches.append((board, check, batch_value, scalar_value))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark and verify the batched board evaluator')
+    parser.add_argument('--count', '-n', type=int, default=1000000, help='Boards per benchmark run (default: 1000000)')
+    parser.add_argument('--no-verify', action='store_true', help='Skip the check against the scalar methods')
+    args = parser.parse_args()
+
+    if not args.no_verify:
+        mismatches = verify()
+        if mismatches:
+            for board, check, batch_value, scalar_value in mismatches[:10]:
+                print(f"  {check} on {board}: batch {batch_value}, scalar {scalar_value}")
+            print(f"❌ {len(mismatches)} mismatches against the scalar methods")
+            sys.exit(1)
+        print("✅ Verified against the scalar methods on all 3^9 boards")
+
+    rng = np.random.default_rng(0)
+    boards = rng.integers(0, 3, size=(args.count, CELLS), dtype=np.int8)
+    start = time.perf_counter()
+    evaluate_batch(boards, 'O')
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {args.count} boards in {elapsed:.3f}s ({args.count / elapsed:,.0f} boards/sec)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""
+Micro-benchmarks for tictactoe_ai.py.
+
+Every benchmark runs over a fixed corpus of positions (opening, midgame,
+forced win, forced block) and reports ops/sec, latency percentiles per
+operation and, for the searches, nodes/sec. Each benchmark is run several
+times and the median run is reported, along with the spread of the runs
+(noise). Results can be saved as a JSON baseline; later runs are compared
+against it and the script exits with status 1 when any benchmark is slower
+than the baseline by more than the threshold plus the noise measured in
+either run.
+
+Caches are cleared before every sample (outside the timed part). The
+heuristic and search benchmarks also clear them before every operation
+(inside the timed part, a few hundred nanoseconds), so they are measured
+from scratch rather than as memo hits.
+
+Usage: python backend/benchmark.py [--save] [--baseline PATH] [--threshold 0.10] [--repeats 5]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from tictactoe_ai import TicTacToeAI
+from tablebase import load_or_build_tablebase
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+DEFAULT_THRESHOLD = 0.10  # Fail when ops/sec drops by more than 10%
+DEFAULT_MIN_TIME = 0.5  # Seconds of timed samples per benchmark run
+DEFAULT_REPEATS = 5  # Runs per benchmark; the median one is kept
+MIN_SAMPLES = 20
+
+# Fixed positions: (name, board rows, AI symbol); the AI is the side to move
+CORPUS = (
+    ('opening', ('   ', ' X ', '   '), 'O'),
+    ('opening-corner', ('X  ', ' O ', '  X'), 'O'),
+    ('midgame', ('XO ', ' X ', '  O'), 'X'),
+    ('midgame-open', ('XO ', '   ', ' X '), 'O'),
+    ('forced-win', ('XX ', 'OO ', 'X  '), 'O'),
+    ('forced-win-diagonal', ('X O', ' X ', 'O  '), 'X'),
+    ('forced-block', ('X  ', ' X ', 'O  '), 'O'),
+    ('forced-block-column', ('XO ', 'X  ', '   '), 'O'),
+)
+
+
+def corpus_boards():
+    """The corpus as (name, board, ai_player) with boards as lists of lists."""
+    return [(name, [list(row) for row in rows], ai_player) for name, rows, ai_player in CORPUS]
+
+
+def _clear_caches(ai):
+    ai.transposition_table.clear()
+    ai.dfs_memo.clear()
+    ai.heuristic_memo.clear()
+
+
+def _count_nodes(ai, method, run):
+    """Calls run() once with ai.<method> wrapped by a call counter; returns the count."""
+    original = getattr(ai, method)
+    calls = [0]
+
+    def counted(*args):
+        calls[0] += 1
+        return original(*args)
+
+    # The recursion calls self.<method>, so the instance attribute sees every node
+    setattr(ai, method, counted)
+    try:
+        run()
+    finally:
+        delattr(ai, method)
+    return calls[0]
+
+
+def build_benchmarks(ai, searcher):
+    """
+    Returns (name, ops per call, run, node method) tuples. run() performs ops
+    operations; node method names the recursive function whose calls are nodes.
+    searcher is a second instance without the tablebase for the search benchmarks.
+    """
+    positions = corpus_boards()
+    empty = ai.create_board()
+
+    def over_corpus(fn, fresh=False):
+        # fresh: clear the caches before every call, so memoized work is not a lookup
+        def run():
+            for _, board, ai_player in positions:
+                if fresh:
+                    _clear_caches(ai)
+                    _clear_caches(searcher)
+                fn(board, ai_player)
+        return run
+
+    benchmarks = [
+        ('check_winner', len(positions), over_corpus(lambda board, _: ai.check_winner(board)), None),
+        ('get_possible_moves', len(positions), over_corpus(lambda board, _: ai.get_possible_moves(board)), None),
+        ('advanced_heuristic_evaluate', len(positions),
+         over_corpus(lambda board, ai_player: ai.advanced_heuristic_evaluate(board, ai_player), fresh=True), None),
+        ('minimax_empty_board', 1,
+         lambda: searcher.minimax(empty, 0, -float('inf'), float('inf'), True, 'X'), '_minimax_bits'),
+    ]
+    for difficulty in ('easy', 'medium', 'hard'):
+        benchmarks.append((f'get_best_move_{difficulty}', len(positions),
+                           over_corpus(lambda board, ai_player, d=difficulty: ai.get_best_move(board, ai_player, d),
+                                       fresh=True),
+                           None))
+    # Hard mode without the tablebase: the full minimax search
+    benchmarks.append(('get_best_move_hard_search', len(positions),
+                       over_corpus(lambda board, ai_player: searcher.get_best_move(board, ai_player, 'hard'),
+                                   fresh=True),
+                       '_minimax_bits'))
+    return benchmarks
+
+
+def _percentile(sorted_values, fraction):
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run_benchmark(ai, searcher, ops, run, min_time):
+    """Times run() until min_time seconds and MIN_SAMPLES samples; returns the stats dict."""
+    # Per-op latencies are sample time / ops, so sub-microsecond calls are batched
+    repeat = 1
+    while True:
+        _clear_caches(ai)
+        _clear_caches(searcher)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        if time.perf_counter() - start >= 0.001 or repeat >= 1 << 16:
+            break
+        repeat *= 2
+
+    samples = []
+    total = 0.0
+    while total < min_time or len(samples) < MIN_SAMPLES:
+        _clear_caches(ai)
+        _clear_caches(searcher)
+        random.seed(len(samples))  # Same random choices in easy/medium on every run
+        start = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed / (repeat * ops))
+        total += elapsed
+
+    samples.sort()
+    count = len(samples) * repeat * ops
+    stats = {
+        'ops': count,
+        'ops_per_sec': count / total,
+        'p50_us': _percentile(samples, 0.50) * 1e6,
+        'p95_us': _percentile(samples, 0.95) * 1e6,
+        'p99_us': _percentile(samples, 0.99) * 1e6,
+    }
+    return stats
+
+
+def run_repeated(ai, searcher, ops, run, node_method, min_time, repeats):
+    """
+    Runs the benchmark repeats times; returns the stats of the median run, with
+    every run's ops/sec and the noise: their spread, (max - min) / median.
+    """
+    runs = sorted((run_benchmark(ai, searcher, ops, run, min_time) for _ in range(max(repeats, 1))),
+                  key=lambda stats: stats['ops_per_sec'])
+    stats = runs[len(runs) // 2]
+    rates = [r['ops_per_sec'] for r in runs]
+    stats['ops_per_sec_runs'] = rates
+    stats['noise'] = (rates[-1] - rates[0]) / stats['ops_per_sec']
+    stats['nodes_per_sec'] = None
+    if node_method is not None:
+        _clear_caches(ai)
+        _clear_caches(searcher)
+        nodes = _count_nodes(searcher, node_method, run)
+        stats['nodes_per_op'] = nodes / ops
+        stats['nodes_per_sec'] = stats['nodes_per_op'] * stats['ops_per_sec']
+    return stats
+
+
+def run_suite(min_time=DEFAULT_MIN_TIME, only=None, repeats=DEFAULT_REPEATS):
+    """Runs every benchmark (or the ones named in only); returns {name: stats}."""
+    ai = TicTacToeAI()
+    ai.tablebase = load_or_build_tablebase()
+    searcher = TicTacToeAI()
+    results = {}
+    for name, ops, run, node_method in build_benchmarks(ai, searcher):
+        if only and name not in only:
+            continue
+        results[name] = run_repeated(ai, searcher, ops, run, node_method, min_time, repeats)
+        print_result(name, results[name])
+    return results
+
+
+def print_result(name, stats):
+    nodes = f"{stats['nodes_per_sec']:>12,.0f}" if stats['nodes_per_sec'] is not None else f"{'-':>12}"
+    print(f"{name:<28} {stats['ops_per_sec']:>12,.0f} {stats['noise']:>7.1%} {stats['p50_us']:>9.2f} "
+          f"{stats['p95_us']:>9.2f} {stats['p99_us']:>9.2f} {nodes}")
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the median ops/sec change against the baseline; returns the names
+    that regressed. A benchmark fails when it dropped by more than threshold
+    plus the larger noise of the two runs, so a noisy benchmark needs a bigger
+    drop to fail.
+    """
+    regressions = []
+    print(f"\nAgainst baseline (fails below -({threshold:.0%} + noise)):")
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name:<28} new")
+            continue
+        change = stats['ops_per_sec'] / before['ops_per_sec'] - 1
+        # Baselines saved before the repeats were added have no noise
+        allowed = threshold + max(stats['noise'], before.get('noise', 0.0))
+        regressed = change < -allowed
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<28} {change:>+8.1%}  (allowed -{allowed:.1%})  {'❌' if regressed else '✅'}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tictactoe_ai.py against a saved baseline')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Baseline JSON file (default: backend/benchmark_baseline.json)')
+    parser.add_argument('--save', action='store_true', help='Save this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed ops/sec drop before failing, as a fraction (default: 0.10)')
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                        help='Seconds of samples per benchmark run (default: 0.5)')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help='Runs per benchmark, the median one is kept (default: 5)')
+    parser.add_argument('--only', help='Comma-separated benchmark names to run')
+    args = parser.parse_args()
+
+    print(f"Python {platform.python_version()} on {platform.machine()}, {len(CORPUS)} corpus positions\n")
+    print(f"{'Benchmark':<28} {'ops/sec':>12} {'noise':>7} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'nodes/sec':>12}")
+    only = set(args.only.split(',')) if args.only else None
+    results = run_suite(args.min_time, only, args.repeats)
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'results': results}, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline} (run with --save to create one)")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
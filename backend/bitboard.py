@@ -0,0 +1,231 @@
+"""
+Bitboard helpers for the Tic-Tac-Toe AI.
+
+Each side is stored as a 9-bit integer where bit (row * 3 + col) is set when
+that player occupies the cell. Win detection, move generation and piece
+counts are all table lookups indexed by those integers.
+
+Geometry generalises the same layout (bit row * cols + col) to m x n boards
+with k-in-a-row wins, where the tables would be too large to precompute.
+"""
+
+from functools import lru_cache
+
+SIZE = 3
+CELLS = SIZE * SIZE
+FULL_MASK = (1 << CELLS) - 1
+CENTER_MASK = 1 << 4
+CORNER_MASK = (1 << 0) | (1 << 2) | (1 << 6) | (1 << 8)
+
+# Rows, columns, then the two diagonals (same order as the list-of-lists code)
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# IS_WIN[mask] is True when the pieces in mask complete at least one line
+IS_WIN = tuple(any((mask & line) == line for line in WIN_MASKS)
+               for mask in range(1 << CELLS))
+
+# MOVES[empty] lists the empty cell indices in row-major order
+MOVES = tuple(tuple(i for i in range(CELLS) if mask & (1 << i))
+              for mask in range(1 << CELLS))
+
+POPCOUNT = tuple(bin(mask).count('1') for mask in range(1 << CELLS))
+
+# Cell index -> (row, col)
+COORDS = tuple(divmod(i, SIZE) for i in range(CELLS))
+
+
+def board_to_bits(board):
+    """Converts a list-of-lists board into (x_bits, o_bits)."""
+    x_bits = 0
+    o_bits = 0
+    bit = 1
+    for row in board:
+        for cell in row:
+            if cell == 'X':
+                x_bits |= bit
+            elif cell == 'O':
+                o_bits |= bit
+            bit <<= 1
+    return x_bits, o_bits
+
+
+def bits_to_board(x_bits, o_bits, rows=SIZE, cols=SIZE):
+    """Converts (x_bits, o_bits) back into a list-of-lists board."""
+    board = []
+    for r in range(rows):
+        row = []
+        for c in range(cols):
+            bit = 1 << (r * cols + c)
+            if x_bits & bit:
+                row.append('X')
+            elif o_bits & bit:
+                row.append('O')
+            else:
+                row.append(' ')
+        board.append(row)
+    return board
+
+
+# Board strings have one character per cell, row by row: 'X', 'O', or '.'
+# (also '-' or ' ') for an empty cell
+BOARD_STRING_CHARS = frozenset('XO.- ')
+_X_DIGITS = str.maketrans('XO.- ', '10000')
+_O_DIGITS = str.maketrans('XO.- ', '01000')
+
+
+def string_to_bits(text, rows=SIZE, cols=SIZE):
+    """Converts a board string into (x_bits, o_bits); raises ValueError if it is malformed."""
+    if len(text) != rows * cols or not BOARD_STRING_CHARS.issuperset(text):
+        raise ValueError(f"board string must be {rows * cols} characters of 'X', 'O' and '.'")
+    # Reversed, the first cell is the lowest bit
+    text = text[::-1]
+    return int(text.translate(_X_DIGITS), 2), int(text.translate(_O_DIGITS), 2)
+
+
+def bits_to_string(x_bits, o_bits, rows=SIZE, cols=SIZE):
+    """Converts (x_bits, o_bits) into a board string with '.' for empty cells."""
+    return ''.join('X' if x_bits >> i & 1 else 'O' if o_bits >> i & 1 else '.'
+                   for i in range(rows * cols))
+
+
+def player_bits(board, player):
+    """Returns (player_bits, opponent_bits) for the given player symbol."""
+    x_bits, o_bits = board_to_bits(board)
+    if player == 'X':
+        return x_bits, o_bits
+    return o_bits, x_bits
+
+
+def winner_of(x_bits, o_bits):
+    """Returns 'X', 'O' or None, checking X first like check_winner."""
+    if IS_WIN[x_bits]:
+        return 'X'
+    if IS_WIN[o_bits]:
+        return 'O'
+    return None
+
+
+def _transform_table(transform):
+    """Builds a 512-entry table mapping a mask to its transformed mask."""
+    table = []
+    for mask in range(1 << CELLS):
+        out = 0
+        for i in MOVES[mask]:
+            r, c = COORDS[i]
+            nr, nc = transform(r, c)
+            out |= 1 << (nr * SIZE + nc)
+        table.append(out)
+    return tuple(table)
+
+
+# The 8 rotations and reflections of the square (the dihedral group D4)
+SYMMETRY_TABLES = tuple(_transform_table(t) for t in (
+    lambda r, c: (r, c),
+    lambda r, c: (c, SIZE - 1 - r),
+    lambda r, c: (SIZE - 1 - r, SIZE - 1 - c),
+    lambda r, c: (SIZE - 1 - c, r),
+    lambda r, c: (r, SIZE - 1 - c),
+    lambda r, c: (SIZE - 1 - r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (SIZE - 1 - c, SIZE - 1 - r),
+))
+
+
+def canonical_key(a_bits, b_bits):
+    """Returns the smallest (a << 9 | b) over all 8 symmetries of the position."""
+    return min((t[a_bits] << CELLS) | t[b_bits] for t in SYMMETRY_TABLES)
+
+
+def popcount(mask):
+    """Number of set bits in an arbitrarily large mask."""
+    return bin(mask).count('1')
+
+
+def iter_bits(mask):
+    """Yields the indices of the set bits in mask, lowest first (row-major order)."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Geometry:
+    """Cell masks and winning lines for a rows x cols board with k-in-a-row wins."""
+
+    def __init__(self, rows, cols, k):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = rows * cols
+        self.full_mask = (1 << self.cells) - 1
+        self.coords = tuple(divmod(i, cols) for i in range(self.cells))
+
+        # Every run of k cells along a row, column or diagonal
+        lines = []
+        for r in range(rows):
+            for c in range(cols):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_r = r + dr * (k - 1)
+                    end_c = c + dc * (k - 1)
+                    if 0 <= end_r < rows and 0 <= end_c < cols:
+                        mask = 0
+                        for j in range(k):
+                            mask |= 1 << ((r + dr * j) * cols + c + dc * j)
+                        lines.append(mask)
+        self.win_masks = tuple(lines)
+        self.lines_through = tuple(tuple(line for line in lines if line >> i & 1)
+                                   for i in range(self.cells))
+        # Same lines as indices into win_masks (for per-line counters)
+        self.line_ids_through = tuple(tuple(j for j, line in enumerate(lines) if line >> i & 1)
+                                      for i in range(self.cells))
+
+        # Cells within one step of each cell (used to skip far-away moves)
+        neighbors = []
+        for r, c in self.coords:
+            mask = 0
+            for nr in range(max(0, r - 1), min(rows, r + 2)):
+                for nc in range(max(0, c - 1), min(cols, c + 2)):
+                    mask |= 1 << (nr * cols + nc)
+            neighbors.append(mask)
+        self.neighbors = tuple(neighbors)
+
+        center_rows = {(rows - 1) // 2, rows // 2}
+        center_cols = {(cols - 1) // 2, cols // 2}
+        self.center_mask = 0
+        for r in center_rows:
+            for c in center_cols:
+                self.center_mask |= 1 << (r * cols + c)
+        self.corner_mask = 0
+        for r, c in ((0, 0), (0, cols - 1), (rows - 1, 0), (rows - 1, cols - 1)):
+            self.corner_mask |= 1 << (r * cols + c)
+
+    def has_win(self, bits):
+        """True when bits completes any line."""
+        for line in self.win_masks:
+            if bits & line == line:
+                return True
+        return False
+
+    def wins_through(self, bits, cell):
+        """True when bits completes a line through cell (the last move)."""
+        for line in self.lines_through[cell]:
+            if bits & line == line:
+                return True
+        return False
+
+    def neighborhood(self, occupied):
+        """Mask of every cell next to an occupied cell."""
+        mask = 0
+        for i in iter_bits(occupied):
+            mask |= self.neighbors[i]
+        return mask
+
+
+@lru_cache(maxsize=None)
+def get_geometry(rows, cols, k):
+    """Returns the shared Geometry for a board size."""
+    return Geometry(rows, cols, k)
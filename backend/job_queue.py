@@ -0,0 +1,152 @@
+"""
+Asynchronous AI move jobs (/move_jobs).
+
+A job is queued in a bounded local queue and returns an id at once.
+Dispatcher threads take jobs off the queue and run them on the worker
+processes of move_pool, so a long search never occupies a web worker.
+Finished jobs are kept for a while so clients can poll (or long-poll) for
+the result.
+
+Jobs live in the memory of one web process: with several gunicorn workers a
+client has to reach the same worker again to read its job.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+
+from move_pool import get_pool, shutdown_pool, solve, DEFAULT_WORKERS
+
+MAX_QUEUE_DEPTH = int(os.environ.get('JOB_QUEUE_DEPTH', 1000))
+JOB_RETENTION = float(os.environ.get('JOB_RETENTION', 300))  # seconds a finished job is kept
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised by JobQueue.submit when max_depth jobs are already waiting."""
+
+
+class Job:
+    def __init__(self, task):
+        self.id = uuid.uuid4().hex
+        self.task = task
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def finish(self, status, result=None, error=None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        self.done.set()
+
+
+class JobQueue:
+    def __init__(self, max_depth=MAX_QUEUE_DEPTH, workers=DEFAULT_WORKERS, retention=JOB_RETENTION):
+        self.max_depth = max_depth
+        self.workers = workers
+        self.retention = retention
+        # Jobs waiting to start, oldest first; a cancelled job is taken out at once
+        self._waiting = deque()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._threads = []
+
+    def _start(self):
+        """Starts the dispatcher threads (lazily, so they run in the serving process)."""
+        if self._threads:
+            return
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._dispatch, name=f'move-job-{n}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _dispatch(self):
+        # One dispatcher per worker process keeps the pool busy without
+        # piling work up inside it, so queue depth and cancellation stay here
+        while True:
+            with self._lock:
+                while not self._waiting:
+                    self._ready.wait()
+                job = self._waiting.popleft()
+                job.status = RUNNING
+            pool = get_pool()
+            try:
+                result = pool.submit(solve, job.task).result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    shutdown_pool(pool)  # The next job starts a fresh pool
+                with self._lock:
+                    if job.status == RUNNING:
+                        job.finish(FAILED, error=str(e))
+                continue
+            with self._lock:
+                # A job cancelled while running keeps its cancelled status
+                if job.status == RUNNING:
+                    job.finish(DONE, result=result)
+
+    def _purge(self):
+        """Forgets finished jobs older than the retention period (caller holds the lock)."""
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, task):
+        """Queues a move_pool task; returns the Job or raises JobQueueFull."""
+        job = Job(task)
+        with self._lock:
+            self._start()
+            self._purge()
+            if len(self._waiting) >= self.max_depth:
+                raise JobQueueFull(f'Job queue is full ({self.max_depth} jobs waiting)')
+            self._waiting.append(job)
+            self._jobs[job.id] = job
+            self._ready.notify()
+        return job
+
+    def get(self, job_id):
+        """Returns the Job for job_id, or None if it is unknown or expired."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout):
+        """Waits up to timeout seconds for the job to finish; returns the Job or None."""
+        job = self.get(job_id)
+        if job is not None and timeout > 0:
+            job.done.wait(timeout)
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued or running job and returns it (None if unknown). A running
+        search cannot be interrupted in its worker process, so its result is dropped.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status not in FINISHED:
+                if job.status == QUEUED:
+                    # Frees its place in the queue right away
+                    self._waiting.remove(job)
+                job.finish(CANCELLED)
+            return job
+
+    def depth(self):
+        """Number of jobs waiting to start (cancelled jobs do not count)."""
+        with self._lock:
+            return len(self._waiting)
@@ -0,0 +1,333 @@
+"""
+Load generator that plays simulated players through the real game flow.
+
+Each player is a thread that plays whole games the way the web UI does:
+/start_game, then per move /log_move, /move (on the AI's turn) and
+/check_game_state, and /end_game when the game is over (--flow play uses one
+/play request per turn instead). The player's own moves are random legal
+moves; difficulties are drawn from a weighted mix.
+
+It runs against a server (--url) or, without --url, in this process through
+the Flask test client, so it needs no network. The report is JSON with
+throughput, latency percentiles and error rates per route, for comparing
+builds; every non-2xx status and every failed connection counts as an error.
+
+In-process runs write their games to a scratch SQLite file (--database),
+not to the app database.
+
+Usage: python backend/loadtest.py [--url http://localhost:5001] [--players 20] [--games 5]
+                                  [--mix easy=30,medium=40,hard=30] [--output report.json]
+"""
+
+import argparse
+import contextlib
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+DEFAULT_MIX = 'easy=30,medium=40,hard=30'
+FLOWS = ('classic', 'play')
+
+
+def parse_mix(text):
+    """Difficulty weights from 'easy=30,medium=40,hard=30'; returns (difficulties, weights)."""
+    difficulties, weights = [], []
+    for part in filter(None, (part.strip() for part in text.split(','))):
+        difficulty, _, weight = part.partition('=')
+        difficulties.append(difficulty.strip().lower())
+        weights.append(float(weight or 1))
+    if not difficulties or sum(weights) <= 0:
+        raise ValueError(f'No difficulties in mix {text!r}')
+    return difficulties, weights
+
+
+class HTTPTransport:
+    """JSON over one keep-alive connection to a running server."""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.prefix = parts.path.rstrip('/')
+
+    def post(self, path, body):
+        """Returns (status, decoded JSON body or None)."""
+        try:
+            self.connection.request('POST', self.prefix + path, body=json.dumps(body),
+                                    headers={'Content-Type': 'application/json'})
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            # Start over on a fresh connection next time
+            self.connection.close()
+            raise
+        try:
+            return response.status, json.loads(data)
+        except ValueError:
+            return response.status, None
+
+    def close(self):
+        self.connection.close()
+
+
+class ClientTransport:
+    """JSON through the Flask test client, in this process."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def post(self, path, body):
+        response = self.client.post(path, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+    def close(self):
+        pass
+
+
+class Player:
+    """One simulated player; records (route, status, seconds) for every request it makes."""
+
+    def __init__(self, transport, rng, difficulties, weights, rows, cols, k, think_time):
+        self.transport = transport
+        self.rng = rng
+        self.difficulties = difficulties
+        self.weights = weights
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.think_time = think_time
+        self.samples = []
+        self.games_completed = 0
+        self.games_failed = 0
+
+    def request(self, path, body):
+        """Sends one request; returns the JSON body, or None when it failed (already recorded)."""
+        started = time.perf_counter()
+        try:
+            status, data = self.transport.post(path, body)
+        except (OSError, http.client.HTTPException):
+            status, data = 0, None  # Connection refused, reset or timed out
+        self.samples.append((path, status, time.perf_counter() - started))
+        if not 200 <= status < 300 or data is None:
+            return None
+        return data
+
+    def random_cell(self, board):
+        empty = [(r, c) for r in range(self.rows) for c in range(self.cols) if board[r][c] == '']
+        return self.rng.choice(empty)
+
+    def think(self):
+        if self.think_time:
+            time.sleep(self.think_time)
+
+    def play_game(self, flow):
+        """Plays one game; returns True when it reached the end without a failed request."""
+        player_symbol = self.rng.choice('XO')
+        ai_symbol = 'O' if player_symbol == 'X' else 'X'
+        difficulty = self.rng.choices(self.difficulties, self.weights)[0]
+        size = {'rows': self.rows, 'cols': self.cols, 'k': self.k}
+        started = self.request('/start_game', dict(size, player_symbol=player_symbol, ai_symbol=ai_symbol,
+                                                    difficulty=difficulty))
+        if started is None:
+            return False
+        game_id = started['game_id']
+        board = [['' for _ in range(self.cols)] for _ in range(self.rows)]
+        if flow == 'play':
+            return self.play_turns(game_id, board, player_symbol)
+        return self.play_classic(game_id, board, player_symbol, ai_symbol, difficulty, size)
+
+    def play_classic(self, game_id, board, player_symbol, ai_symbol, difficulty, size):
+        """The web UI's flow without a session: log, ask for the AI move, check the state"""
+        turn = 'X'
+        move_number = 0
+        while True:
+            if turn == player_symbol:
+                self.think()
+                row, col = self.random_cell(board)
+            else:
+                move = self.request('/move', dict(size, board=board, ai_player=ai_symbol, difficulty=difficulty))
+                if move is None:
+                    return False
+                row, col = move['row'], move['col']
+            board[row][col] = turn
+            move_number += 1
+            logged = self.request('/log_move', {'game_id': game_id, 'move_number': move_number, 'row': row,
+                                                'col': col, 'player': turn, 'is_ai_move': turn == ai_symbol})
+            if logged is None:
+                return False
+            state = self.request('/check_game_state', dict(size, board=board))
+            if state is None:
+                return False
+            if state['game_state'] != 'ongoing':
+                return self.request('/end_game', {'game_id': game_id, 'winner': state['winner'],
+                                                  'player_symbol': player_symbol}) is not None
+            turn = 'O' if turn == 'X' else 'X'
+
+    def play_turns(self, game_id, board, player_symbol):
+        """One /play request per turn (the first one without a move when the AI plays X)"""
+        body = {'game_id': game_id}
+        if player_symbol == 'X':
+            body['row'], body['col'] = self.random_cell(board)
+        while True:
+            turn = self.request('/play', body)
+            if turn is None:
+                return False
+            board = turn['board']
+            if turn['game_state'] != 'ongoing':
+                return True
+            self.think()
+            row, col = self.random_cell(board)
+            body = {'game_id': game_id, 'row': row, 'col': col}
+
+    def run(self, flow, games, deadline):
+        """Plays games until it has played the given number, or until the deadline if one is set."""
+        played = 0
+        while (played < games) if deadline is None else (time.perf_counter() < deadline):
+            if self.play_game(flow):
+                self.games_completed += 1
+            else:
+                self.games_failed += 1
+            played += 1
+        self.transport.close()
+
+
+def _percentile(sorted_values, fraction):
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    """Throughput, error rate and latency percentiles (ms) of (route, status, seconds) samples."""
+    latencies = sorted(seconds for _, _, seconds in samples)
+    errors = sum(1 for _, status, _ in samples if not 200 <= status < 300)
+    summary = {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+    }
+    if latencies:
+        summary.update({
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+            'p50_ms': round(_percentile(latencies, 0.50) * 1000, 3),
+            'p95_ms': round(_percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(_percentile(latencies, 0.99) * 1000, 3),
+            'max_ms': round(latencies[-1] * 1000, 3),
+        })
+    return summary
+
+
+def make_transport_factory(url, timeout, database):
+    """Returns a function creating one transport per player, and the target's name for the report."""
+    if url:
+        return (lambda: HTTPTransport(url, timeout)), url
+    # In process: point the app at a scratch database before it is imported
+    os.environ['DATABASE_PATH'] = database
+    with contextlib.redirect_stdout(sys.stderr):
+        from app import app
+    return (lambda: ClientTransport(app)), 'flask-test-client'
+
+
+def run_load(new_transport, players=20, games=5, duration=None, flow='classic', mix=DEFAULT_MIX,
+             rows=3, cols=3, k=3, think_time=0.0, seed=None, quiet=False):
+    """Runs the players to completion; returns the report as a dict."""
+    difficulties, weights = parse_mix(mix)
+    seeder = random.Random(seed)
+    simulated = [Player(new_transport(), random.Random(seeder.random()), difficulties, weights,
+                        rows, cols, k, think_time) for _ in range(players)]
+
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+    threads = [threading.Thread(target=player.run, args=(flow, games, deadline), daemon=True)
+               for player in simulated]
+    # The app logs every request to stdout; keep it off the report
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stderr):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = [sample for player in simulated for sample in player.samples]
+    routes = {}
+    for sample in samples:
+        routes.setdefault(sample[0], []).append(sample)
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    report = {
+        'flow': flow,
+        'players': players,
+        'games_per_player': None if duration else games,
+        'duration_limit_s': duration,
+        'mix': dict(zip(difficulties, weights)),
+        'board': {'rows': rows, 'cols': cols, 'k': k},
+        'think_time_ms': think_time * 1000,
+        'seed': seed,
+        'elapsed_s': round(elapsed, 3),
+        'games': {
+            'completed': sum(player.games_completed for player in simulated),
+            'failed': sum(player.games_failed for player in simulated),
+        },
+        'total': summarize(samples, elapsed),
+        'routes': {route: summarize(route_samples, elapsed) for route, route_samples in sorted(routes.items())},
+        'statuses': dict(sorted(statuses.items())),
+    }
+    report['games']['per_sec'] = round(report['games']['completed'] / elapsed, 2) if elapsed else 0.0
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate concurrent players against the Tic-Tac-Toe app')
+    parser.add_argument('--url', help='Server to load (default: the app in this process via the Flask test client)')
+    parser.add_argument('--players', type=int, default=20, help='Concurrent simulated players (default: 20)')
+    parser.add_argument('--games', type=int, default=5, help='Games per player (default: 5)')
+    parser.add_argument('--duration', type=float, help='Play for this many seconds instead of a number of games')
+    parser.add_argument('--flow', choices=FLOWS, default='classic',
+                        help='classic: /log_move + /move + /check_game_state per move; play: one /play per turn')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Difficulty weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--rows', type=int, default=3)
+    parser.add_argument('--cols', type=int, default=3)
+    parser.add_argument('-k', type=int, default=3, help='Pieces in a row to win (default: 3)')
+    parser.add_argument('--think-ms', type=float, default=0, help="Pause before each of the player's moves")
+    parser.add_argument('--timeout', type=float, default=30, help='Seconds before a request counts as failed')
+    parser.add_argument('--seed', type=int, help='Seed for the players (difficulties, symbols and moves)')
+    parser.add_argument('--database', help='SQLite file for in-process runs (default: a temporary file)')
+    parser.add_argument('--output', help='Write the JSON report here as well as to stdout')
+    parser.add_argument('--verbose', action='store_true', help="Show the app's request log on stderr")
+    args = parser.parse_args()
+
+    scratch = None
+    database = args.database
+    if not args.url and not database:
+        scratch = tempfile.TemporaryDirectory(prefix='tictactoe-loadtest-')
+        database = os.path.join(scratch.name, 'loadtest.db')
+    try:
+        new_transport, target = make_transport_factory(args.url, args.timeout, database)
+        print(f"Load test: {args.players} players, flow {args.flow}, mix {args.mix} against {target}",
+              file=sys.stderr)
+        report = run_load(new_transport, args.players, args.games, args.duration, args.flow, args.mix,
+                          args.rows, args.cols, args.k, args.think_ms / 1000, args.seed, quiet=not args.verbose)
+    finally:
+        if scratch is not None:
+            scratch.cleanup()
+    report = dict({'target': target}, **report)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+        print(f"Saved report to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Monte Carlo Tree Search engine (the 'mcts' difficulty).
+
+Each playout walks the tree with UCT selection, expands one new move, plays
+random moves to the end of the game on a pair of bitboards and backs the
+result up the path. Strength and latency scale with the playout / time
+budget, so it also works on boards where exhaustive minimax is infeasible.
+
+Trees are kept per game_id: on the next move of the same game the engine
+walks down the old tree through the moves that were played and keeps
+searching from there instead of starting over.
+"""
+
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from bitboard import get_geometry, board_to_bits, iter_bits
+
+DEFAULT_PLAYOUTS = int(os.environ.get('MCTS_PLAYOUTS', 2000))
+DEFAULT_TIME_BUDGET = float(os.environ.get('MCTS_TIME_BUDGET', 1.0))  # seconds
+MAX_TREES = int(os.environ.get('MCTS_MAX_TREES', 256))
+
+EXPLORATION = math.sqrt(2)
+
+# depth is the length of the most-visited line; completed is False when the time
+# budget ran out before the playout budget
+MCTSResult = namedtuple('MCTSResult', ['move', 'playouts', 'reused', 'depth', 'completed'])
+
+
+class _Node:
+    """A tree node; side is the player (0 = AI, 1 = opponent) who played move."""
+
+    __slots__ = ('move', 'side', 'parent', 'children', 'untried', 'terminal', 'winner', 'wins', 'visits')
+
+    def __init__(self, move, side, parent, untried, terminal=False, winner=None):
+        self.move = move
+        self.side = side
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.terminal = terminal
+        self.winner = winner
+        self.wins = 0.0
+        self.visits = 0
+
+
+class MCTSEngine:
+    def __init__(self, rows=3, cols=3, k=3, exploration=EXPLORATION, max_trees=MAX_TREES):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.geometry = get_geometry(rows, cols, k)
+        self.exploration = exploration
+        self.max_trees = max_trees
+        # game_id -> (ai_player, own_bits, opp_bits, root) for tree reuse
+        self._trees = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expandable(self, own, opp):
+        """Moves the tree may expand (cells next to pieces on big boards, like MNKEngine)."""
+        geometry = self.geometry
+        occupied = own | opp
+        empty = geometry.full_mask ^ occupied
+        if occupied and geometry.cells > 16:
+            empty &= geometry.neighborhood(occupied)
+        return list(iter_bits(empty))
+
+    def _rollout(self, bits, side):
+        """Plays random moves from the position to the end; returns the winning side or None."""
+        geometry = self.geometry
+        wins_through = geometry.wins_through
+        empty = list(iter_bits(geometry.full_mask ^ (bits[0] | bits[1])))
+        random.shuffle(empty)
+        for cell in empty:
+            bits[side] |= 1 << cell
+            if wins_through(bits[side], cell):
+                return side
+            side = 1 - side
+        return None
+
+    def _playout(self, root, own, opp):
+        """One select / expand / simulate / backpropagate cycle."""
+        geometry = self.geometry
+        bits = [own, opp]
+        node = root
+        side = 0  # Side to move at the root is the AI
+
+        # Selection: follow the UCT-best child while the node is fully expanded
+        exploration = self.exploration
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            best_value = -1.0
+            best_child = None
+            for child in node.children:
+                value = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+                if value > best_value:
+                    best_value = value
+                    best_child = child
+            node = best_child
+            bits[node.side] |= 1 << node.move
+            side = 1 - node.side
+
+        # Expansion: add one untried move
+        if node.untried:
+            move = node.untried.pop(random.randrange(len(node.untried)))
+            bits[side] |= 1 << move
+            if geometry.wins_through(bits[side], move):
+                child = _Node(move, side, node, [], terminal=True, winner=side)
+            elif (bits[0] | bits[1]) == geometry.full_mask:
+                child = _Node(move, side, node, [], terminal=True)
+            else:
+                child = _Node(move, side, node, self._expandable(bits[side], bits[1 - side]))
+            node.children.append(child)
+            node = child
+            side = 1 - side
+
+        # Simulation
+        if node.terminal:
+            winner = node.winner
+        else:
+            winner = self._rollout(bits, side)
+
+        # Backpropagation: each node scores the result for the side that moved into it
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.side:
+                node.wins += 1.0
+            node = node.parent
+
+    def _reuse_tree(self, game_id, ai_player, own, opp):
+        """Returns the subtree for (own, opp) from this game's previous search, or None."""
+        with self._lock:
+            entry = self._trees.pop(game_id, None)
+        if entry is None:
+            return None
+        stored_ai, node_own, node_opp, node = entry
+        if stored_ai != ai_player or node_own & ~own or node_opp & ~opp:
+            return None
+
+        # Walk down through the moves played since (AI and opponent alternate)
+        bits = [node_own, node_opp]
+        target = (own, opp)
+        side = 0
+        while (bits[0], bits[1]) != target:
+            played = target[side] & ~bits[side]
+            child = next((c for c in node.children if played >> c.move & 1), None)
+            if child is None:
+                return None
+            node = child
+            bits[side] |= 1 << node.move
+            side = 1 - side
+        if side != 0 or node.terminal:
+            return None
+        node.parent = None
+        return node
+
+    def _save_tree(self, game_id, ai_player, own, opp, root):
+        with self._lock:
+            self._trees[game_id] = (ai_player, own, opp, root)
+            self._trees.move_to_end(game_id)
+            while len(self._trees) > self.max_trees:
+                self._trees.popitem(last=False)
+
+    def forget(self, game_id):
+        """Drops the stored tree for a game (e.g. when it ends)."""
+        with self._lock:
+            self._trees.pop(game_id, None)
+
+    def search(self, own, opp, playouts=None, time_budget=None, game_id=None, ai_player='O'):
+        """
+        Runs playouts from the position (own to move) until either the playout
+        budget or the time budget (seconds) is used up. Returns an MCTSResult
+        with the most visited move as (row, col).
+        """
+        geometry = self.geometry
+        if (own | opp) == geometry.full_mask or geometry.has_win(own) or geometry.has_win(opp):
+            return MCTSResult(None, 0, False, 0, True)
+
+        # Take an immediate win without searching
+        for i in iter_bits(geometry.full_mask ^ (own | opp)):
+            if geometry.wins_through(own | (1 << i), i):
+                return MCTSResult(geometry.coords[i], 0, False, 1, True)
+
+        playouts = DEFAULT_PLAYOUTS if playouts is None else playouts
+        time_budget = DEFAULT_TIME_BUDGET if time_budget is None else time_budget
+
+        root = None
+        if game_id is not None:
+            root = self._reuse_tree(game_id, ai_player, own, opp)
+        reused = root is not None
+        if root is None:
+            root = _Node(-1, 1, None, self._expandable(own, opp))
+
+        deadline = time.perf_counter() + time_budget
+        done = 0
+        while done < playouts:
+            self._playout(root, own, opp)
+            done += 1
+            if done & 63 == 0 and time.perf_counter() > deadline:
+                break
+
+        if root.children:
+            best = max(root.children, key=lambda c: (c.visits, c.wins))
+            move = best.move
+        else:
+            move = random.choice(root.untried)
+
+        # Depth of the principal line (most-visited child at every level)
+        depth = 0
+        node = root
+        while node.children:
+            node = max(node.children, key=lambda c: c.visits)
+            depth += 1
+
+        if game_id is not None:
+            self._save_tree(game_id, ai_player, own, opp, root)
+        return MCTSResult(geometry.coords[move], done, reused, depth, done >= playouts)
+
+    def get_best_move(self, board, ai_player='O', playouts=None, time_budget=None, game_id=None):
+        """Public method matching TicTacToeAI.get_best_move: returns (row, col) or None."""
+        return self.get_best_move_result(board, ai_player, playouts, time_budget, game_id).move
+
+    def get_best_move_result(self, board, ai_player='O', playouts=None, time_budget=None, game_id=None,
+                             stats=None):
+        """
+        Like get_best_move, but returns the whole MCTSResult. A SearchStats is
+        filled in from the result: playouts as nodes, the principal line as depth
+        and a reused tree as a cache hit.
+        """
+        x_bits, o_bits = board_to_bits(board)
+        own, opp = (x_bits, o_bits) if ai_player == 'X' else (o_bits, x_bits)
+        if stats is None:
+            return self.search(own, opp, playouts, time_budget, game_id, ai_player)
+        started = time.perf_counter()
+        result = self.search(own, opp, playouts, time_budget, game_id, ai_player)
+        stats.wall_time += time.perf_counter() - started
+        stats.nodes += result.playouts
+        stats.max_depth = max(stats.max_depth, result.depth)
+        if game_id is not None:
+            if result.reused:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+        return result
@@ -0,0 +1,78 @@
+"""
+Prometheus metrics for the Flask app (served at /metrics).
+
+Request counts, latency, errors and in-flight requests are labelled by route
+(the URL rule, e.g. /move_jobs/<job_id>, so ids do not create new series);
+request latency is also labelled by difficulty for the AI routes.
+DB commit latency is labelled by the endpoint that commits.
+
+Under gunicorn every worker process has its own counters. Set
+PROMETHEUS_MULTIPROC_DIR to an empty directory before the app starts and the
+workers write their values to files there; /metrics then adds up all workers,
+whichever one answers. Dead workers are cleaned up by the child_exit hook
+(see mark_process_dead).
+"""
+
+import os
+
+from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST,
+                               REGISTRY, generate_latest, multiprocess)
+
+MULTIPROCESS = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+REQUESTS = Counter('tictactoe_http_requests_total', 'HTTP requests served',
+                   ['route', 'method', 'status'])
+REQUEST_LATENCY = Histogram('tictactoe_http_request_duration_seconds', 'Time to serve a request',
+                            ['route', 'difficulty'], buckets=LATENCY_BUCKETS)
+ERRORS = Counter('tictactoe_http_errors_total', 'Requests answered with a 4xx or 5xx status',
+                 ['route', 'status'])
+IN_FLIGHT = Gauge('tictactoe_http_requests_in_flight', 'Requests being served right now',
+                  ['route'], multiprocess_mode='livesum')
+DB_COMMIT_LATENCY = Histogram('tictactoe_db_commit_duration_seconds', 'Time to commit a database write',
+                              ['endpoint'], buckets=DB_BUCKETS)
+ADMISSION_REJECTED = Counter('tictactoe_admission_rejected_total',
+                             'AI requests turned away with 503 because the search capacity was in use',
+                             ['route', 'reason'])
+
+
+def request_started(route):
+    IN_FLIGHT.labels(route).inc()
+
+
+def request_finished(route, method, status, difficulty, seconds):
+    REQUESTS.labels(route, method, str(status)).inc()
+    REQUEST_LATENCY.labels(route, difficulty or '').observe(seconds)
+    if status >= 400:
+        ERRORS.labels(route, str(status)).inc()
+
+
+def request_closed(route):
+    IN_FLIGHT.labels(route).dec()
+
+
+def admission_rejected(route, reason):
+    ADMISSION_REJECTED.labels(route, reason).inc()
+
+
+def commit_timer(endpoint):
+    """Context manager that records how long the enclosed commit takes."""
+    return DB_COMMIT_LATENCY.labels(endpoint).time()
+
+
+def render():
+    """Returns (body, content type) of the text exposition of every metric."""
+    if MULTIPROCESS:
+        # Read the values every worker wrote, not just this process's
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """Drops the live gauges of a dead worker (call from gunicorn's child_exit hook)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
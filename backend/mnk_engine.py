@@ -0,0 +1,623 @@
+"""
+Board-size-aware engine for m,n,k-games (an m x n board, k in a row wins).
+
+Full minimax only finishes on 3x3, so hard mode here uses iterative-deepening
+principal variation search (negamax form) with a heuristic evaluation at the
+depth limit. Each iteration finishes before the next one starts, so the best
+move of the last completed depth is always ready when the time budget runs out
+(or a better one from the interrupted iteration, once it has been proved).
+
+Moves are ordered so alpha-beta prunes early: transposition-table move,
+immediate wins, blocks, killer moves, center, corners, then the history
+heuristic. Run with --compare to see node counts against find_best_move.
+
+The search runs on a SearchState (search_state.py): moves are made and unmade
+in place, wins are detected on the lines through the last move and the
+heuristic score is updated by delta, so no node rescans the whole board.
+
+With parallel=True the iterations from PARALLEL_MIN_DEPTH on are searched
+root-parallel on the move pool (parallel_search.py), one chunk of root moves
+per worker process.
+
+Boards use the same bitboard layout as bitboard.py (bit row * cols + col).
+"""
+
+import os
+import random
+import sys
+import time
+
+from bitboard import get_geometry, board_to_bits, bits_to_board, iter_bits, popcount
+from search_state import SearchState, SearchResult
+from search_stats import CountingLookup
+from tictactoe_ai import TicTacToeAI
+
+MIN_SIZE = 3
+MAX_SIZE = 15
+
+WIN_SCORE = 1000000
+INFINITY = WIN_SCORE + 1  # Integer bound so null windows (alpha, alpha + 1) work
+# Scores beyond this are forced wins/losses rather than heuristic values
+WIN_THRESHOLD = WIN_SCORE - 1000
+
+DEFAULT_TIME_BUDGET = float(os.environ.get('MNK_TIME_BUDGET', 1.0))  # seconds
+
+# Shallower iterations take less time than a round trip to the pool
+PARALLEL_MIN_DEPTH = 3
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class _SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out."""
+
+
+def _score_to_tt(score, ply):
+    """Makes a forced win/loss score relative to the node it was found at."""
+    if score > WIN_THRESHOLD:
+        return score + ply
+    if score < -WIN_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score, ply):
+    """Turns a node-relative win/loss score back into one relative to the root."""
+    if score > WIN_THRESHOLD:
+        return score - ply
+    if score < -WIN_THRESHOLD:
+        return score + ply
+    return score
+
+
+class MNKEngine:
+    def __init__(self, rows=3, cols=3, k=3, move_ordering=True, parallel=False):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.geometry = get_geometry(rows, cols, k)
+        # Value of a line holding n pieces of one side and none of the other
+        self.line_weights = (0,) + tuple(10 ** (n - 1) for n in range(1, k + 1))
+        # Same heuristic as evaluate(), in the tables SearchState updates incrementally
+        stride = k + 1
+        line_scores = [0] * (stride * stride)
+        for n in range(1, k + 1):
+            line_scores[n * stride] = self.line_weights[n]
+            line_scores[n] = -self.line_weights[n]
+        self.line_scores = tuple(line_scores)
+        center = self.geometry.center_mask
+        self.cell_scores = (
+            tuple(1 if center >> i & 1 else 0 for i in range(self.geometry.cells)),
+            tuple(-1 if center >> i & 1 else 0 for i in range(self.geometry.cells)),
+        )
+        # Disable to measure how much the ordering heuristics prune
+        self.move_ordering = move_ordering
+        # Search the deeper hard-mode iterations on the move pool
+        self.parallel = parallel
+        self._deadline = None
+        self._reset_search()
+
+    # --- 1. Board Representation and Game Logic ---
+
+    def create_board(self):
+        """Creates an empty rows x cols board."""
+        return [[' ' for _ in range(self.cols)] for _ in range(self.rows)]
+
+    def get_possible_moves(self, board):
+        """Returns a list of all empty (row, col) spots on the board."""
+        x_bits, o_bits = board_to_bits(board)
+        empty = self.geometry.full_mask ^ (x_bits | o_bits)
+        return [self.geometry.coords[i] for i in iter_bits(empty)]
+
+    def check_winner(self, board):
+        """Checks if there's a winner and returns the winner or None."""
+        x_bits, o_bits = board_to_bits(board)
+        if self.geometry.has_win(x_bits):
+            return 'X'
+        if self.geometry.has_win(o_bits):
+            return 'O'
+        return None
+
+    def is_board_full(self, board):
+        """Checks if the board has any empty spaces left."""
+        x_bits, o_bits = board_to_bits(board)
+        return (x_bits | o_bits) == self.geometry.full_mask
+
+    def get_game_state(self, board):
+        """Returns the current game state: winner or 'tie' or None if ongoing."""
+        winner = self.check_winner(board)
+        if winner:
+            return winner
+        if self.is_board_full(board):
+            return 'tie'
+        return None
+
+    # --- 2. Evaluation and Move Generation ---
+
+    def evaluate(self, own, opp):
+        """
+        Heuristic score of a position for the side to move (own), computed from
+        scratch. The search reads the same value from SearchState.score.
+        """
+        weights = self.line_weights
+        score = 0
+        for line in self.geometry.win_masks:
+            own_line = own & line
+            opp_line = opp & line
+            if own_line and not opp_line:
+                score += weights[popcount(own_line)]
+            elif opp_line and not own_line:
+                score -= weights[popcount(opp_line)]
+        center = self.geometry.center_mask
+        score += popcount(own & center) - popcount(opp & center)
+        return score
+
+    def candidate_moves(self, own, opp):
+        """Empty cells worth searching, in row-major order."""
+        geometry = self.geometry
+        occupied = own | opp
+        empty = geometry.full_mask ^ occupied
+        # On big boards only cells next to existing pieces are worth a look
+        if occupied and geometry.cells > 16:
+            empty &= geometry.neighborhood(occupied)
+        return list(iter_bits(empty))
+
+    def new_state(self, own, opp):
+        """SearchState for a position, with own as side 0."""
+        return SearchState(self.geometry, self.line_scores, self.cell_scores, own, opp)
+
+    def find_winning_cell(self, own, opp):
+        """Returns a cell that completes a line for own, or None."""
+        geometry = self.geometry
+        for i in iter_bits(geometry.full_mask ^ (own | opp)):
+            if geometry.wins_through(own | (1 << i), i):
+                return i
+        return None
+
+    # --- 3. Iterative-Deepening Principal Variation Search ---
+
+    def _reset_search(self):
+        """Clears per-search state: node counter, transposition table, killers and history."""
+        self.nodes = 0
+        self._tt = {}
+        self._killers = [[-1, -1] for _ in range(self.geometry.cells + 1)]
+        self._history = [0] * self.geometry.cells
+        self._root_partial = None
+
+    def order_moves(self, state, side, moves, tt_move=-1, ply=0):
+        """
+        Sorts moves best-first: immediate wins, the transposition-table move,
+        blocks of the opponent's wins, killer moves, then center, corners and
+        the history heuristic. Ties keep row-major order.
+        """
+        if not self.move_ordering:
+            if tt_move >= 0:
+                moves.remove(tt_move)
+                moves.insert(0, tt_move)
+            return moves
+
+        geometry = self.geometry
+        killers = self._killers[ply]
+        history = self._history
+        center = geometry.center_mask
+        corners = geometry.corner_mask
+        other = 1 - side
+        keys = {}
+        for i in moves:
+            bit = 1 << i
+            if state.wins_if_played(i, side):
+                priority = 7
+            elif i == tt_move:
+                priority = 6
+            elif state.wins_if_played(i, other):
+                priority = 5
+            elif i == killers[0] or i == killers[1]:
+                priority = 4
+            elif center & bit:
+                priority = 3
+            elif corners & bit:
+                priority = 2
+            else:
+                priority = 1
+            keys[i] = (priority, history[i])
+        moves.sort(key=keys.__getitem__, reverse=True)
+        return moves
+
+    def _store_cutoff(self, move, depth, ply):
+        """Remembers a move that caused a beta cutoff (killer + history heuristics)."""
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self._history[move] += depth * depth
+
+    def _negamax(self, state, side, depth, alpha, beta, ply):
+        """Principal variation search in negamax form for the side to move."""
+        self.nodes += 1
+        if self._deadline is not None and self.nodes & 255 == 0 and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+
+        # A win by the previous move is caught by make() in the parent
+        bits = state.bits
+        own = bits[side]
+        opp = bits[1 - side]
+        if (own | opp) == self.geometry.full_mask:
+            return 0
+        if depth == 0:
+            return state.score if side == 0 else -state.score
+
+        key = (own, opp)
+        entry = self._tt.get(key)
+        tt_move = -1
+        if entry is not None:
+            entry_depth, entry_score, flag, tt_move = entry
+            if entry_depth >= depth:
+                entry_score = _score_from_tt(entry_score, ply)
+                if flag == EXACT:
+                    return entry_score
+                if flag == LOWER:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+        window_alpha = alpha
+
+        moves = self.order_moves(state, side, self.candidate_moves(own, opp), tt_move, ply)
+        first = moves[0]
+        if state.wins_if_played(first, side):
+            return WIN_SCORE - ply - 1  # Winning move available (sorted first)
+
+        other = 1 - side
+        best_score = -INFINITY
+        best_move = first
+        for i in moves:
+            if state.make(i, side):
+                score = WIN_SCORE - ply - 1
+            elif i == first:
+                score = -self._negamax(state, other, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                # Null-window probe: prove the move is no better than alpha
+                score = -self._negamax(state, other, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self._negamax(state, other, depth - 1, -beta, -alpha, ply + 1)
+            state.unmake(i, side)
+            if score > best_score:
+                best_score = score
+                best_move = i
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self._store_cutoff(i, depth, ply)
+                break
+
+        if best_score <= window_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._tt[key] = (depth, _score_to_tt(best_score, ply), flag, best_move)
+        return best_score
+
+    def _search_root(self, state, moves, depth):
+        """
+        Searches every root move (side 0 to move) to depth; returns (best_score, best_cell).
+        The best result so far is kept in self._root_partial in case the time runs out.
+        """
+        alpha = -INFINITY
+        best_score = -INFINITY
+        best_move = moves[0]
+        self._root_partial = None
+        for i in moves:
+            if state.make(i, 0):
+                score = WIN_SCORE - 1
+            elif i == moves[0]:
+                score = -self._negamax(state, 1, depth - 1, -INFINITY, INFINITY, 1)
+            else:
+                score = -self._negamax(state, 1, depth - 1, -alpha - 1, -alpha, 1)
+                if score > alpha:
+                    score = -self._negamax(state, 1, depth - 1, -INFINITY, -alpha, 1)
+            state.unmake(i, 0)
+            if score > best_score:
+                best_score = score
+                best_move = i
+            if score > alpha:
+                alpha = score
+            # Scores are exact or fail low, so the best searched move is proved at least as good
+            self._root_partial = (best_score, best_move)
+        return best_score, best_move
+
+    def root_moves(self, own, opp):
+        """Candidate root moves for own in search order (deterministic for a position)."""
+        self._reset_search()
+        return self.order_moves(self.new_state(own, opp), 0, self.candidate_moves(own, opp))
+
+    def score_root_move(self, own, opp, cell, depth, alpha=-INFINITY, time_budget=None):
+        """
+        Scores one root move with a fixed-depth search and a fresh table; used
+        by the root-parallel search. Each ply adds one piece, so every table
+        entry has the depth it is probed at and the score is a pure function of
+        the position: exact when it is above alpha - 1, otherwise an upper bound.
+        Returns (score, nodes), with a None score when time_budget seconds ran out.
+        """
+        self._reset_search()
+        state = self.new_state(own, opp)
+        if state.make(cell, 0):
+            return WIN_SCORE - 1, 0
+        self._deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        try:
+            # Window (alpha - 1, inf) keeps moves that tie alpha exact, for a stable tie-break
+            score = -self._negamax(state, 1, depth - 1, -INFINITY, -(alpha - 1), 1)
+        except _SearchTimeout:
+            score = None
+        finally:
+            self._deadline = None
+            self._tt = {}
+        return score, self.nodes
+
+    def _search_root_parallel(self, own, opp, moves, depth):
+        """
+        _search_root on the move pool (parallel_search.search_root), within
+        what is left of the time budget; raises _SearchTimeout when it runs out.
+        """
+        # parallel_search imports this module
+        from parallel_search import search_root
+        self._root_partial = None
+        time_budget = None
+        if self._deadline is not None:
+            time_budget = self._deadline - time.perf_counter()
+            if time_budget <= 0:
+                raise _SearchTimeout()
+        found = search_root(self.rows, self.cols, self.k, own, opp, moves, depth, time_budget)
+        if found is None:
+            raise _SearchTimeout()
+        best_score, best_move, nodes = found
+        self.nodes += nodes
+        return best_score, best_move
+
+    def search(self, own, opp, max_depth=None, time_budget=None):
+        """
+        Iterative deepening from depth 1 up to max_depth (default: to the end of
+        the game) within time_budget seconds. Returns a SearchResult whose move
+        is a (row, col) tuple, or None on a finished board. SearchResult.nodes
+        counts every node visited across all iterations.
+        """
+        geometry = self.geometry
+        self._reset_search()
+
+        moves = self.candidate_moves(own, opp)
+        if not moves or geometry.has_win(own) or geometry.has_win(opp):
+            return SearchResult(None, 0, 0, True, 0)
+
+        winning = self.find_winning_cell(own, opp)
+        if winning is not None:
+            return SearchResult(geometry.coords[winning], WIN_SCORE - 1, 1, True, 0)
+
+        remaining = popcount(geometry.full_mask ^ (own | opp))
+        depth_limit = remaining if max_depth is None else min(max_depth, remaining)
+        if time_budget is None:
+            time_budget = DEFAULT_TIME_BUDGET
+        self._deadline = time.perf_counter() + time_budget if time_budget > 0 else None
+
+        state = self.new_state(own, opp)
+        moves = self.order_moves(state, 0, moves)
+        best_move = moves[0]
+        best_score = 0
+        reached = 0
+        completed = False
+        try:
+            for depth in range(1, depth_limit + 1):
+                try:
+                    if self.parallel and depth >= PARALLEL_MIN_DEPTH:
+                        best_score, best_move = self._search_root_parallel(own, opp, moves, depth)
+                    else:
+                        best_score, best_move = self._search_root(state, moves, depth)
+                except _SearchTimeout:
+                    # Keep the interrupted iteration's best move once the previous best was re-searched
+                    if self._root_partial is not None:
+                        best_score, best_move = self._root_partial
+                    break
+                reached = depth
+                # Search the previous best move first on the next iteration
+                moves.remove(best_move)
+                moves.insert(0, best_move)
+                if abs(best_score) > WIN_THRESHOLD:
+                    break  # Forced result found; deeper search cannot change it
+            else:
+                completed = True
+            if abs(best_score) > WIN_THRESHOLD:
+                completed = True
+        finally:
+            self._deadline = None
+            self._tt = {}
+
+        return SearchResult(geometry.coords[best_move], best_score, reached, completed, self.nodes)
+
+    # --- 4. AI Difficulty Levels ---
+
+    def easy_move(self, own, opp):
+        """Easy difficulty: mostly random, sometimes takes wins or blocks (as TicTacToeAI)."""
+        empty = list(iter_bits(self.geometry.full_mask ^ (own | opp)))
+
+        winning = self.find_winning_cell(own, opp)
+        if winning is not None and random.random() < 0.7:
+            return winning
+
+        blocking = self.find_winning_cell(opp, own)
+        if blocking is not None and random.random() < 0.5:
+            return blocking
+
+        if random.random() < 0.3:
+            centers = [i for i in iter_bits(self.geometry.center_mask) if i in empty]
+            if centers and random.random() < 0.5:
+                return random.choice(centers)
+
+            corners = [i for i in iter_bits(self.geometry.corner_mask) if i in empty]
+            if corners and random.random() < 0.5:
+                return random.choice(corners)
+
+        return random.choice(empty)
+
+    def medium_move(self, own, opp, max_depth=2):
+        """Medium difficulty: shallow alpha-beta with the heuristic, plus deliberate mistakes."""
+        blocking = self.find_winning_cell(opp, own)
+        if blocking is not None and random.random() < 0.85:
+            return blocking
+
+        winning = self.find_winning_cell(own, opp)
+        if winning is not None and random.random() < 0.9:
+            return winning
+
+        self._reset_search()
+        state = self.new_state(own, opp)
+        move_scores = []
+        for i in self.candidate_moves(own, opp):
+            if state.make(i, 0):
+                score = WIN_SCORE - 1
+            else:
+                score = -self._negamax(state, 1, max_depth - 1, -INFINITY, INFINITY, 1)
+            state.unmake(i, 0)
+            move_scores.append((i, score))
+        self._tt = {}
+
+        move_scores.sort(key=lambda x: x[1], reverse=True)
+        if len(move_scores) > 1 and random.random() < 0.35:
+            top_moves = move_scores[:min(4, len(move_scores))]
+            return random.choice(top_moves)[0]
+        return move_scores[0][0]
+
+    def get_best_move(self, board, ai_player='O', difficulty='hard', time_budget=None):
+        """
+        Public method to get the AI move based on difficulty level.
+        Difficulty options: 'easy', 'medium', 'hard'
+        """
+        return self.get_best_move_result(board, ai_player, difficulty, time_budget).move
+
+    def get_best_move_result(self, board, ai_player='O', difficulty='hard', time_budget=None, stats=None):
+        """
+        Like get_best_move, but returns the SearchResult: hard mode reports the
+        depth of the last completed iteration and whether the search finished
+        within time_budget seconds (easy and medium always finish).
+        With a SearchStats the search runs instrumented and fills it in.
+        """
+        if stats is not None:
+            started = time.perf_counter()
+            view = _InstrumentedEngine(self, stats)
+            result = view.get_best_move_result(board, ai_player, difficulty, time_budget)
+            stats.nodes += view.nodes
+            stats.wall_time += time.perf_counter() - started
+            return result
+        x_bits, o_bits = board_to_bits(board)
+        own, opp = (x_bits, o_bits) if ai_player == 'X' else (o_bits, x_bits)
+        if (own | opp) == self.geometry.full_mask:
+            return SearchResult(None, None, 0, True, None)
+
+        difficulty = difficulty.lower()
+        if difficulty == 'easy':
+            return SearchResult(self.geometry.coords[self.easy_move(own, opp)], None, 1, True, None)
+        elif difficulty == 'medium':
+            return SearchResult(self.geometry.coords[self.medium_move(own, opp)], None, 2, True, None)
+        return self.search(own, opp, time_budget=time_budget)
+
+    def print_board(self, board):
+        """Prints the current board state."""
+        print("\n")
+        for r, row in enumerate(board):
+            print(" " + " | ".join(row) + " ")
+            if r < self.rows - 1:
+                print("|".join(["---"] * self.cols))
+        print("\n")
+
+
+class _InstrumentedEngine(MNKEngine):
+    """
+    View of an MNKEngine that counts into a SearchStats while it searches
+    (the engine counts nodes itself). It has its own per-search state, so the
+    wrapped engine is not touched.
+    """
+
+    def __init__(self, engine, stats):
+        self.__dict__.update(engine.__dict__)
+        # Nodes searched in the pool's processes would not be counted
+        self.parallel = False
+        self.stats = stats
+        self._reset_search()
+
+    def _reset_search(self):
+        MNKEngine._reset_search(self)
+        self._tt = CountingLookup({}, self.stats)
+
+    def _negamax(self, state, side, depth, alpha, beta, ply):
+        stats = self.stats
+        if ply > stats.max_depth:
+            stats.max_depth = ply
+        score = MNKEngine._negamax(self, state, side, depth, alpha, beta, ply)
+        # A non-leaf node that fails high was cut off (by pruning or a table bound)
+        if score >= beta and depth > 0 and (state.bits[0] | state.bits[1]) != self.geometry.full_mask:
+            stats.cutoffs += 1
+        return score
+
+
+def count_minimax_nodes(board, ai_player):
+    """Nodes visited by TicTacToeAI.find_best_move with no transposition table or tablebase."""
+    ai = TicTacToeAI(tt_max_entries=0)
+    search = ai._minimax_bits
+    nodes = [0]
+
+    def counting_search(*args):
+        nodes[0] += 1
+        return search(*args)
+
+    # The recursion goes through self._minimax_bits, so this counts every node
+    ai._minimax_bits = counting_search
+    ai.find_best_move(board, ai_player)
+    return nodes[0]
+
+
+def compare_node_counts():
+    """Prints node counts for plain minimax and for PVS with and without move ordering."""
+    positions = [
+        ('3x3 empty', (3, 3, 3), 0, 0, None),
+        ('3x3 after X center', (3, 3, 3), 0, 1 << 4, None),
+        ('3x3 midgame', (3, 3, 3), (1 << 0) | (1 << 8), (1 << 4) | (1 << 2), None),
+        ('4x4 k=3 empty', (4, 4, 3), 0, 0, 6),
+        ('5x5 k=4 after X center', (5, 5, 4), 0, 1 << 12, 5),
+        ('7x7 k=5 after X center', (7, 7, 5), 0, 1 << 24, 4),
+    ]
+    print(f"{'position':<26}{'minimax':>12}{'pvs':>12}{'pvs+ordering':>14}")
+    for name, dims, own, opp, depth in positions:
+        minimax_nodes = '-'
+        if dims == (3, 3, 3):
+            # own is the side to move; with equal piece counts that is X, otherwise O
+            ai_player = 'X' if bin(own).count('1') == bin(opp).count('1') else 'O'
+            x_bits, o_bits = (own, opp) if ai_player == 'X' else (opp, own)
+            minimax_nodes = count_minimax_nodes(bits_to_board(x_bits, o_bits), ai_player)
+        counts = []
+        for ordering in (False, True):
+            engine = MNKEngine(*dims, move_ordering=ordering)
+            counts.append(engine.search(own, opp, max_depth=depth, time_budget=0).nodes)
+        print(f"{name:<26}{minimax_nodes:>12}{counts[0]:>12}{counts[1]:>14}")
+
+
+def main():
+    """Plays a demo game on a 5x5 board (k=4), or compares node counts with --compare."""
+    if '--compare' in sys.argv[1:]:
+        compare_node_counts()
+        return
+
+    engine = MNKEngine(5, 5, 4)
+    board = engine.create_board()
+    player = 'X'
+    while engine.get_game_state(board) is None:
+        move = engine.get_best_move(board, player, 'hard', time_budget=0.5)
+        board[move[0]][move[1]] = player
+        player = 'O' if player == 'X' else 'X'
+    engine.print_board(board)
+    print(f"Result: {engine.get_game_state(board)}")
+
+
+if __name__ == "__main__":
+    main()
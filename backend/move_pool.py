@@ -0,0 +1,140 @@
+"""
+Persistent process pool for batched AI moves (/move_batch), move jobs and
+the root-parallel hard search (parallel_search.py).
+
+The searches are pure Python and hold the GIL, so a batch is split into
+chunks and spread over worker processes. Each worker builds its engines
+once (the 3x3 AI with its tablebase, plus m,n,k and MCTS engines on demand)
+and keeps them for the life of the pool.
+
+The pool is created lazily on first use, so every gunicorn worker gets its
+own pool after forking, and uses the 'spawn' start method so workers never
+inherit Flask threads or database connections.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from tictactoe_ai import TicTacToeAI
+from mnk_engine import MNKEngine
+from mcts import MCTSEngine
+from tablebase import load_or_build_tablebase
+
+DEFAULT_WORKERS = int(os.environ.get('MOVE_POOL_WORKERS', os.cpu_count() or 1))
+# Chunks per worker: enough to balance slow and fast items without paying
+# a round trip per board
+CHUNKS_PER_WORKER = 4
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+# Per-process engines, set up by _init_worker
+_engines = {}
+
+
+def _init_worker():
+    ai = TicTacToeAI()
+    ai.tablebase = load_or_build_tablebase()
+    _engines[(3, 3, 3)] = ai
+
+
+def _get_engine(rows, cols, k, difficulty):
+    key = ('mcts', rows, cols, k) if difficulty == 'mcts' else (rows, cols, k)
+    engine = _engines.get(key)
+    if engine is None:
+        if difficulty == 'mcts':
+            engine = MCTSEngine(rows, cols, k)
+        else:
+            engine = MNKEngine(rows, cols, k)
+        _engines[key] = engine
+    return engine
+
+
+def solve(task):
+    """
+    Computes one move. task is (board, ai_player, difficulty, rows, cols, k,
+    playouts, time_budget) with a board that is already validated and
+    normalized; returns the engine's SearchResult (or MCTSResult).
+    """
+    board, ai_player, difficulty, rows, cols, k, playouts, time_budget = task
+    engine = _get_engine(rows, cols, k, difficulty)
+    if difficulty == 'mcts':
+        return engine.get_best_move_result(board, ai_player, playouts=playouts, time_budget=time_budget)
+    return engine.get_best_move_result(board, ai_player, difficulty, time_budget)
+
+
+def solve_chunk(tasks):
+    """Solves a list of tasks; returns ('ok', result) or ('error', message) per task."""
+    results = []
+    for task in tasks:
+        try:
+            results.append(('ok', solve(task)))
+        except Exception as e:
+            results.append(('error', str(e)))
+    return results
+
+
+def get_pool(max_workers=DEFAULT_WORKERS):
+    """Returns the shared process pool, starting it on first use."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            print(f"Starting move pool with {max_workers} worker processes")
+            _pool = ProcessPoolExecutor(max_workers=max_workers,
+                                        mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=_init_worker)
+            _pool_workers = max_workers
+        return _pool
+
+
+def get_pool_workers():
+    """Worker processes of the shared pool, starting it on first use."""
+    get_pool()
+    return _pool_workers
+
+
+def shutdown_pool(pool=None):
+    """Stops the shared pool (only if it is still pool, when given)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and (pool is None or pool is _pool):
+            _pool.shutdown(wait=pool is None, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def solve_batch(tasks):
+    """
+    Solves tasks on the process pool; returns ('ok', result) or ('error', message)
+    for every task, in input order.
+    """
+    if not tasks:
+        return []
+    pool = get_pool()
+    chunk_size = max(1, -(-len(tasks) // (_pool_workers * CHUNKS_PER_WORKER)))
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    try:
+        futures = [pool.submit(solve_chunk, chunk) for chunk in chunks]
+    except BrokenProcessPool:
+        # A worker died earlier; start a fresh pool for the next request
+        shutdown_pool(pool)
+        raise
+
+    results = []
+    for chunk, future in zip(chunks, futures):
+        try:
+            results.extend(future.result())
+        except BrokenProcessPool as e:
+            shutdown_pool(pool)
+            results.extend([('error', f'Worker failed: {e}')] * len(chunk))
+        except Exception as e:
+            # A failed chunk only fails its own items, not the whole batch
+            results.extend([('error', f'Worker failed: {e}')] * len(chunk))
+    return results
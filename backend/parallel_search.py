@@ -0,0 +1,249 @@
+"""
+Root-parallel fixed-depth search for m,n,k boards.
+
+Young-brothers-wait splitting at the root: the first move in search order
+is searched on its own to get an exact score, then the remaining root moves
+are dealt out in one chunk per worker of the shared move pool (move_pool.py).
+Each chunk starts from the first move's score as alpha and raises it as it
+goes, so later moves are refuted with narrow windows just like in a serial
+search.
+
+The chosen move does not depend on timing or on how the moves were dealt:
+every move is searched with the window (alpha - 1, inf) and alpha never
+exceeds the best score, so a move that ties the best score always gets an
+exact score, and ties are broken by search order (see score_root_move).
+
+3x3 find_best_move is a tablebase lookup or a few milliseconds of minimax,
+so the parallel mode is for MNKEngine searches on bigger boards:
+MNKEngine(parallel=True) runs the deeper iterations of its hard search here.
+
+Usage: python backend/parallel_search.py [--depth D] [--workers 1,2,4,8,16]
+"""
+
+import argparse
+import concurrent.futures
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from bitboard import board_to_bits, popcount
+from mnk_engine import MNKEngine, INFINITY, WIN_THRESHOLD
+from move_pool import get_pool, get_pool_workers, shutdown_pool, DEFAULT_WORKERS
+from search_state import SearchResult
+
+# Per-process engines for the worker tasks
+_engines = {}
+
+
+def _get_engine(rows, cols, k):
+    engine = _engines.get((rows, cols, k))
+    if engine is None:
+        engine = _engines[(rows, cols, k)] = MNKEngine(rows, cols, k)
+    return engine
+
+
+def _score_moves(task):
+    """
+    Worker task: scores (index, cell) root moves in order, raising alpha as it
+    goes; returns ([(index, score)], nodes), or None when time_budget ran out.
+    """
+    rows, cols, k, own, opp, indexed_moves, depth, alpha, time_budget = task
+    engine = _get_engine(rows, cols, k)
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    scores = []
+    nodes = 0
+    for index, cell in indexed_moves:
+        budget = None
+        if deadline is not None:
+            budget = deadline - time.perf_counter()
+            if budget <= 0:
+                return None
+        score, searched = engine.score_root_move(own, opp, cell, depth, alpha, budget)
+        if score is None:
+            return None
+        scores.append((index, score))
+        nodes += searched
+        alpha = max(alpha, score)
+    return scores, nodes
+
+
+def _pick(scores, moves):
+    """Best (score, index) with ties going to the earlier move in search order."""
+    best_index, best_score = min(scores.items(), key=lambda item: (-item[1], item[0]))
+    return best_score, moves[best_index]
+
+
+def _prepare(rows, cols, k, own, opp, depth):
+    """Shared start of both searches: returns (engine, ordered moves, depth) or a finished SearchResult."""
+    engine = _get_engine(rows, cols, k)
+    geometry = engine.geometry
+    moves = engine.candidate_moves(own, opp)
+    if not moves or geometry.has_win(own) or geometry.has_win(opp):
+        return SearchResult(None, 0, 0, True, 0)
+    depth = min(depth, popcount(geometry.full_mask ^ (own | opp)))
+    return engine, engine.root_moves(own, opp), depth
+
+
+def serial_search(rows, cols, k, own, opp, depth):
+    """The same search on one core (the baseline for the speedup report)."""
+    prepared = _prepare(rows, cols, k, own, opp, depth)
+    if isinstance(prepared, SearchResult):
+        return prepared
+    engine, moves, depth = prepared
+    scores, nodes = _score_moves((rows, cols, k, own, opp, list(enumerate(moves)), depth, -INFINITY, None))
+    best_score, best_move = _pick(dict(scores), moves)
+    return SearchResult(engine.geometry.coords[best_move], best_score, depth, True, nodes)
+
+
+def _run_tasks(pool, tasks, deadline):
+    """Runs tasks on the pool; returns their results, or None if any ran out of time."""
+    try:
+        futures = [pool.submit(_score_moves, task) for task in tasks]
+    except BrokenProcessPool:
+        # A worker died earlier; start a fresh pool for the next search
+        shutdown_pool(pool)
+        raise
+    timeout = max(deadline - time.perf_counter(), 0) if deadline is not None else None
+    done, pending = concurrent.futures.wait(futures, timeout=timeout)
+    if pending:
+        # The pool was busy with other work; the running tasks stop at their own budget
+        for future in pending:
+            future.cancel()
+        return None
+    try:
+        results = [future.result() for future in futures]
+    except BrokenProcessPool:
+        shutdown_pool(pool)
+        raise
+    return None if None in results else results
+
+
+def search_root(rows, cols, k, own, opp, moves, depth, time_budget=None):
+    """
+    Scores the root moves (own to move, in search order) to depth on the move
+    pool; returns (best_score, best_cell, nodes), or None when time_budget
+    seconds ran out first.
+    """
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+
+    def remaining():
+        return deadline - time.perf_counter() if deadline is not None else None
+
+    pool = get_pool()
+    # Eldest brother first, on its own, for an exact bound
+    results = _run_tasks(pool, [(rows, cols, k, own, opp, [(0, moves[0])], depth, -INFINITY, remaining())],
+                         deadline)
+    if results is None:
+        return None
+    first, nodes = results[0]
+    scores = dict(first)
+    first_score = scores[0]
+    if first_score < WIN_THRESHOLD and len(moves) > 1:
+        # Dealt round-robin so every chunk starts with one of the better-ordered moves
+        chunks = get_pool_workers()
+        indexed_moves = list(enumerate(moves))[1:]
+        tasks = [(rows, cols, k, own, opp, indexed_moves[i::chunks], depth, first_score, remaining())
+                 for i in range(min(chunks, len(indexed_moves)))]
+        results = _run_tasks(pool, tasks, deadline)
+        if results is None:
+            return None
+        for chunk_scores, searched in results:
+            scores.update(chunk_scores)
+            nodes += searched
+
+    best_score, best_move = _pick(scores, moves)
+    return best_score, best_move, nodes
+
+
+class ParallelSearch:
+    """Fixed-depth root-parallel search on the shared move pool."""
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        # Only takes effect when this starts the pool
+        self.workers = workers
+
+    def warm_up(self):
+        """Starts every worker process so timings do not include process start-up."""
+        pool = get_pool(self.workers)
+        list(pool.map(time.sleep, [0.05] * get_pool_workers()))
+
+    def close(self):
+        """Stops the shared pool (the next search starts a new one)."""
+        shutdown_pool()
+
+    def search(self, rows, cols, k, own, opp, depth):
+        """Fixed-depth search of the position (own to move); returns a SearchResult."""
+        prepared = _prepare(rows, cols, k, own, opp, depth)
+        if isinstance(prepared, SearchResult):
+            return prepared
+        engine, moves, depth = prepared
+        get_pool(self.workers)
+        best_score, best_move, nodes = search_root(rows, cols, k, own, opp, moves, depth)
+        return SearchResult(engine.geometry.coords[best_move], best_score, depth, True, nodes)
+
+    def get_best_move(self, board, ai_player='O', depth=5, rows=3, cols=3, k=3):
+        """Board-based wrapper matching the engines' get_best_move: returns (row, col) or None."""
+        x_bits, o_bits = board_to_bits(board)
+        own, opp = (x_bits, o_bits) if ai_player == 'X' else (o_bits, x_bits)
+        return self.search(rows, cols, k, own, opp, depth).move
+
+
+# Positions for the speedup report: (label, rows, cols, k, x cells, o cells)
+BENCHMARK_POSITIONS = (
+    ('5x5 k=4 after X center', 5, 5, 4, [(2, 2)], []),
+    ('7x7 k=5 midgame', 7, 7, 5, [(3, 3), (2, 4)], [(3, 4), (4, 2)]),
+    ('9x9 k=5 opening', 9, 9, 5, [(4, 4)], [(4, 5)]),
+)
+
+
+def _position_bits(cols, cells):
+    bits = 0
+    for r, c in cells:
+        bits |= 1 << (r * cols + c)
+    return bits
+
+
+def speedup_report(depth, worker_counts):
+    """Times every benchmark position serially and on each pool size; prints the speedups."""
+    print(f"Root-parallel search, depth {depth} ({os.cpu_count()} CPUs available)")
+    positions = []
+    for label, rows, cols, k, x_cells, o_cells in BENCHMARK_POSITIONS:
+        # X moves first, so X is to move when both sides have the same number of pieces
+        x_bits = _position_bits(cols, x_cells)
+        o_bits = _position_bits(cols, o_cells)
+        own, opp = (x_bits, o_bits) if len(x_cells) == len(o_cells) else (o_bits, x_bits)
+        start = time.perf_counter()
+        result = serial_search(rows, cols, k, own, opp, depth)
+        positions.append((label, rows, cols, k, own, opp, result, time.perf_counter() - start))
+        print(f"  {label}: serial {positions[-1][7]:.2f}s, move {result.move}, {result.nodes} nodes")
+
+    print(f"\n{'Workers':>8} {'Time':>8} {'Speedup':>8}  Same move")
+    serial_total = sum(position[7] for position in positions)
+    print(f"{'serial':>8} {serial_total:>7.2f}s {1.0:>7.2f}x")
+    for workers in worker_counts:
+        searcher = ParallelSearch(workers)
+        searcher.warm_up()
+        try:
+            total = 0.0
+            same = True
+            for label, rows, cols, k, own, opp, expected, _ in positions:
+                start = time.perf_counter()
+                result = searcher.search(rows, cols, k, own, opp, depth)
+                total += time.perf_counter() - start
+                same = same and result.move == expected.move and result.score == expected.score
+        finally:
+            searcher.close()
+        print(f"{workers:>8} {total:>7.2f}s {serial_total / total:>7.2f}x  {'✅' if same else '❌'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the speedup of the root-parallel search per core count')
+    parser.add_argument('--depth', '-d', type=int, default=5, help='Search depth (default: 5)')
+    parser.add_argument('--workers', '-w', default='1,2,4,8,16',
+                        help='Comma-separated worker counts (default: 1,2,4,8,16)')
+    args = parser.parse_args()
+    speedup_report(args.depth, [int(n) for n in args.workers.split(',')])
+
+
+if __name__ == '__main__':
+    main()
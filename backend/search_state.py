@@ -0,0 +1,123 @@
+"""
+Incrementally updated search state for the limited-depth and m,n,k searches.
+
+SearchState keeps, for each side, a bitboard and a piece count per winning
+line. make()/unmake() only touch the lines through the played cell, so a move
+costs O(lines through a cell) instead of a full board scan:
+
+- a win is detected when a line through the last move reaches k pieces
+- the heuristic score is updated by the change in value of those lines
+
+Scores are from the point of view of side 0 (the side the evaluation is for).
+
+SearchResult is what the engines report for one move search: the move as
+(row, col), its score, the depth fully searched, whether the search finished
+(rather than being cut off by its time budget) and the nodes visited.
+"""
+
+from collections import namedtuple
+
+SearchResult = namedtuple('SearchResult', ['move', 'score', 'depth', 'completed', 'nodes'])
+
+
+class SearchState:
+    def __init__(self, geometry, line_scores, cell_scores, bits0=0, bits1=0):
+        """
+        line_scores[count0 * (k + 1) + count1] is the value of a line holding
+        count0 pieces of side 0 and count1 of side 1; cell_scores[side][cell]
+        is a positional bonus for side owning cell.
+        """
+        self.geometry = geometry
+        self.k = geometry.k
+        self.full_mask = geometry.full_mask
+        self.cell_lines = geometry.line_ids_through
+        self.cell_scores = cell_scores
+
+        # Score change when a side adds a piece to a line, indexed by
+        # own_count * (k + 1) + other_count before the move
+        stride = self.k + 1
+        self._stride = stride
+        deltas0 = [0] * (stride * stride)
+        deltas1 = [0] * (stride * stride)
+        for own in range(self.k):
+            for other in range(stride - own - 1):
+                deltas0[own * stride + other] = (line_scores[(own + 1) * stride + other]
+                                                 - line_scores[own * stride + other])
+                deltas1[own * stride + other] = (line_scores[other * stride + own + 1]
+                                                 - line_scores[other * stride + own])
+        self._deltas = (tuple(deltas0), tuple(deltas1))
+
+        lines = len(geometry.win_masks)
+        self.bits = [0, 0]
+        self.counts = ([0] * lines, [0] * lines)
+        self.score = lines * line_scores[0]
+        for side, bits in ((0, bits0), (1, bits1)):
+            cell = 0
+            while bits:
+                if bits & 1:
+                    self.make(cell, side)
+                bits >>= 1
+                cell += 1
+
+    @property
+    def occupied(self):
+        return self.bits[0] | self.bits[1]
+
+    def make(self, cell, side):
+        """Places side's piece on cell; returns True if it completes a line."""
+        self.bits[side] |= 1 << cell
+        counts = self.counts[side]
+        other = self.counts[1 - side]
+        deltas = self._deltas[side]
+        stride = self._stride
+        k = self.k
+        score = self.score + self.cell_scores[side][cell]
+        won = False
+        for line in self.cell_lines[cell]:
+            count = counts[line]
+            score += deltas[count * stride + other[line]]
+            count += 1
+            counts[line] = count
+            if count == k:
+                won = True
+        self.score = score
+        return won
+
+    def unmake(self, cell, side):
+        """Removes side's piece from cell (the reverse of make)."""
+        self.bits[side] &= ~(1 << cell)
+        counts = self.counts[side]
+        other = self.counts[1 - side]
+        deltas = self._deltas[side]
+        stride = self._stride
+        score = self.score - self.cell_scores[side][cell]
+        for line in self.cell_lines[cell]:
+            count = counts[line] - 1
+            counts[line] = count
+            score -= deltas[count * stride + other[line]]
+        self.score = score
+
+    def peek(self, cell, side):
+        """Returns (wins, score) for side playing cell, without changing the state."""
+        counts = self.counts[side]
+        other = self.counts[1 - side]
+        deltas = self._deltas[side]
+        stride = self._stride
+        target = self.k - 1
+        score = self.score + self.cell_scores[side][cell]
+        won = False
+        for line in self.cell_lines[cell]:
+            count = counts[line]
+            score += deltas[count * stride + other[line]]
+            if count == target:
+                won = True
+        return won, score
+
+    def wins_if_played(self, cell, side):
+        """True if side playing the empty cell would complete a line."""
+        counts = self.counts[side]
+        target = self.k - 1
+        for line in self.cell_lines[cell]:
+            if counts[line] == target:
+                return True
+        return False
@@ -0,0 +1,107 @@
+"""
+Per-search statistics (nodes, cutoffs, depth, cache hits, wall time).
+
+Collecting them costs nothing when they are not asked for: the engines only
+count inside an instrumented view (a subclass that overrides the recursive
+search methods), which is created for a search that was given a SearchStats.
+The plain search methods have no counters or checks in them.
+
+StatsTotals sums the statistics of many searches per difficulty.
+"""
+
+import threading
+
+
+class SearchStats:
+    """
+    Counters for one search:
+    - nodes: positions visited (MCTS: playouts)
+    - cutoffs: nodes that returned early because the alpha-beta window was
+      refuted (by pruning the remaining moves or by a table bound)
+    - max_depth: deepest ply reached below the root
+    - cache_hits / cache_misses: lookups in the transposition table, memos,
+      tablebase or reused MCTS tree
+    - wall_time: seconds spent in the search
+    """
+
+    __slots__ = ('nodes', 'cutoffs', 'max_depth', 'cache_hits', 'cache_misses', 'wall_time')
+
+    def __init__(self):
+        self.nodes = 0
+        self.cutoffs = 0
+        self.max_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.wall_time = 0.0
+
+    def as_dict(self):
+        return {
+            'nodes': self.nodes,
+            'cutoffs': self.cutoffs,
+            'max_depth': self.max_depth,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'wall_time_ms': round(self.wall_time * 1000, 3),
+        }
+
+
+class CountingLookup:
+    """
+    Wraps a cache, memo or tablebase so the lookups made through it count as
+    hits or misses in a SearchStats; everything else goes to the wrapped object.
+    """
+
+    def __init__(self, target, stats):
+        self._target = target
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def _count(self, value):
+        if value is None:
+            self._stats.cache_misses += 1
+        else:
+            self._stats.cache_hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self._target[key] = value
+
+    def get(self, key, default=None):
+        return self._count(self._target.get(key, default))
+
+    def best_move(self, *args):
+        return self._count(self._target.best_move(*args))
+
+
+class StatsTotals:
+    """Sums of SearchStats per difficulty, safe to update from several threads."""
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, difficulty, stats):
+        with self._lock:
+            total = self._totals.get(difficulty)
+            if total is None:
+                total = self._totals[difficulty] = {'searches': 0, 'nodes': 0, 'cutoffs': 0, 'max_depth': 0,
+                                                    'cache_hits': 0, 'cache_misses': 0, 'wall_time': 0.0}
+            total['searches'] += 1
+            total['nodes'] += stats.nodes
+            total['cutoffs'] += stats.cutoffs
+            total['max_depth'] = max(total['max_depth'], stats.max_depth)
+            total['cache_hits'] += stats.cache_hits
+            total['cache_misses'] += stats.cache_misses
+            total['wall_time'] += stats.wall_time
+
+    def snapshot(self):
+        """Returns {difficulty: totals} with the wall time in ms and nodes/sec."""
+        with self._lock:
+            totals = {difficulty: dict(total) for difficulty, total in self._totals.items()}
+        for total in totals.values():
+            wall_time = total.pop('wall_time')
+            total['wall_time_ms'] = round(wall_time * 1000, 3)
+            total['nodes_per_sec'] = round(total['nodes'] / wall_time) if wall_time else 0
+        return totals
@@ -0,0 +1,154 @@
+"""
+In-memory store of active games, keyed by the game_id from /start_game.
+
+Each session keeps the board as a pair of bitboards plus the move count (X
+always moves first, so the count gives the side to move), so /play, /move and
+/check_game_state can work from the game_id alone instead of a board sent
+and parsed on every request.
+
+The store is bounded three ways: number of sessions (LRU), idle time (a
+session not used for ttl seconds is dropped) and an estimate of the memory
+held. An evicted game is rebuilt from the moves table the next time it is
+used, so eviction only costs one query.
+"""
+
+import os
+import sys
+import threading
+import time
+
+from bitboard import bits_to_board
+from cache import LRUCache
+
+MAX_SESSIONS = int(os.environ.get('SESSION_MAX_GAMES', 10000))
+SESSION_TTL = float(os.environ.get('SESSION_TTL', 1800))  # seconds without a request
+MAX_SESSION_BYTES = int(os.environ.get('SESSION_MAX_BYTES', 16 * 1024 * 1024))
+
+
+class GameSession:
+    """Compact state of one ongoing game."""
+
+    __slots__ = ('game_id', 'rows', 'cols', 'k', 'player_symbol', 'ai_symbol', 'difficulty',
+                 'x_bits', 'o_bits', 'move_count', 'last_used', 'lock')
+
+    def __init__(self, game_id, rows, cols, k, player_symbol, ai_symbol, difficulty,
+                 x_bits=0, o_bits=0, move_count=0):
+        self.game_id = game_id
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.player_symbol = player_symbol
+        self.ai_symbol = ai_symbol
+        self.difficulty = difficulty
+        self.x_bits = x_bits
+        self.o_bits = o_bits
+        self.move_count = move_count
+        self.last_used = time.monotonic()
+        # Serializes turns of the same game (two /play requests must not both apply)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_game(cls, game, moves):
+        """Rebuilds a session from a Game row and its Move rows."""
+        session = cls(game.id, game.rows or 3, game.cols or 3, game.k or 3,
+                      game.player_symbol, game.ai_symbol, game.difficulty)
+        for move in moves:
+            session.apply(move.row, move.col, move.player)
+        return session
+
+    @property
+    def turn(self):
+        """Symbol of the side to move."""
+        return 'X' if self.move_count % 2 == 0 else 'O'
+
+    def is_empty(self, row, col):
+        bit = 1 << (row * self.cols + col)
+        return not (self.x_bits | self.o_bits) & bit
+
+    def apply(self, row, col, player):
+        """Records a move by player ('X' or 'O')."""
+        bit = 1 << (row * self.cols + col)
+        if player == 'X':
+            self.x_bits |= bit
+        else:
+            self.o_bits |= bit
+        self.move_count += 1
+
+    def board(self):
+        """The board as a list of lists with ' ' for empty cells, as the engines take it."""
+        return bits_to_board(self.x_bits, self.o_bits, self.rows, self.cols)
+
+    def nbytes(self):
+        """Rough memory held by this session (sized for a full board, so it does not change)."""
+        full_board = 1 << (self.rows * self.cols)
+        return sys.getsizeof(self) + 2 * sys.getsizeof(full_board) + sys.getsizeof(self.lock)
+
+
+class SessionStore(LRUCache):
+    """game_id -> GameSession with LRU, idle-TTL and memory-cap eviction."""
+
+    def __init__(self, max_entries=MAX_SESSIONS, ttl=SESSION_TTL, max_bytes=MAX_SESSION_BYTES):
+        super().__init__(max_entries)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.evictions = 0
+
+    def _drop(self, game_id):
+        """Removes an entry and its bytes (caller holds the lock)."""
+        session = self._entries.pop(game_id, None)
+        if session is not None:
+            self.nbytes -= session.nbytes()
+        return session
+
+    def _expire(self, now):
+        """Drops sessions idle for longer than the TTL (caller holds the lock)."""
+        cutoff = now - self.ttl
+        # Least recently used first, so stop at the first session still in use
+        for game_id, session in list(self._entries.items()):
+            if session.last_used >= cutoff:
+                break
+            self._drop(game_id)
+            self.evictions += 1
+
+    def get(self, game_id, default=None):
+        """Returns the session for game_id (marking it used), or default if absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._entries.get(game_id)
+            if session is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(game_id)
+            session.last_used = now
+            self.hits += 1
+            return session
+
+    def put(self, game_id, session):
+        """Stores a session, evicting the least recently used ones past the count or memory cap."""
+        with self._lock:
+            self._drop(game_id)
+            self._entries[game_id] = session
+            self.nbytes += session.nbytes()
+            self._expire(time.monotonic())
+            while self._entries and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def discard(self, game_id):
+        """Forgets a game (it ended, or its moves were changed some other way)."""
+        with self._lock:
+            self._drop(game_id)
+
+    def clear(self):
+        with self._lock:
+            self.nbytes = 0
+            self.evictions = 0
+        super().clear()
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({'bytes': self.nbytes, 'max_bytes': self.max_bytes, 'ttl': self.ttl,
+                      'evictions': self.evictions})
+        return stats
@@ -0,0 +1,252 @@
+"""
+Perfect-play tablebase for 3x3 hard mode.
+
+Every legal position is solved once by retrograde analysis (from full boards
+back to the empty board) and stored as two byte arrays indexed by the base-3
+encoding of the position, seen from the side to move:
+
+- moves[index]: best cell (0-8), TERMINAL for finished games, or ILLEGAL
+- values[index]: signed score in minimax units (10 - plies to the win, 0 for
+  a draw, negative for a loss)
+
+The best move matches find_best_move exactly (first best move in row-major
+order), so hard_move can answer with a single lookup.
+
+Usage: python backend/tablebase.py [--output PATH] [--no-verify]
+"""
+
+import argparse
+import hashlib
+import os
+import struct
+import sys
+
+from bitboard import CELLS, FULL_MASK, WIN_MASKS, IS_WIN, MOVES, POPCOUNT, COORDS, bits_to_board
+from tictactoe_ai import TicTacToeAI
+
+FORMAT_VERSION = 1
+MAGIC = b'TTTB'
+HEADER = struct.Struct('<4sBBH32s')  # magic, version, cells, entries, fingerprint
+POSITIONS = 3 ** CELLS
+WIN_SCORE = 10
+
+TERMINAL = 254
+ILLEGAL = 255
+
+DEFAULT_PATH = os.environ.get('TABLEBASE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebase.bin'))
+
+# BASE3[mask] is the sum of 3**i over the set bits of mask
+BASE3 = tuple(sum(3 ** i for i in MOVES[mask]) for mask in range(1 << CELLS))
+
+
+def position_index(own_bits, opp_bits):
+    """Base-3 index of a position: 1 marks the side to move, 2 the opponent."""
+    return BASE3[own_bits] + 2 * BASE3[opp_bits]
+
+
+def _fingerprint():
+    """Hash of everything the table depends on; a mismatch marks the file stale."""
+    data = repr((FORMAT_VERSION, CELLS, WIN_MASKS, WIN_SCORE)).encode()
+    return hashlib.sha256(data).digest()
+
+
+def _decode(index):
+    """Inverse of position_index."""
+    own_bits = 0
+    opp_bits = 0
+    for i in range(CELLS):
+        index, digit = divmod(index, 3)
+        if digit == 1:
+            own_bits |= 1 << i
+        elif digit == 2:
+            opp_bits |= 1 << i
+    return own_bits, opp_bits
+
+
+def _is_legal(own_bits, opp_bits):
+    """Positions that can arise with own to move, whoever started the game."""
+    own_count = POPCOUNT[own_bits]
+    opp_count = POPCOUNT[opp_bits]
+    if own_count != opp_count and own_count != opp_count - 1:
+        return False
+    # The side to move cannot already have a line: the game would be over
+    return not IS_WIN[own_bits]
+
+
+def _one_ply_back(score):
+    """Moves a win/loss score one ply further from the end of the game."""
+    if score > 0:
+        return score - 1
+    if score < 0:
+        return score + 1
+    return score
+
+
+class Tablebase:
+    """Best move and score for every legal 3x3 position."""
+
+    def __init__(self, moves, values):
+        self.moves = moves
+        self.values = values
+
+    @classmethod
+    def build(cls):
+        """Solves every legal position by retrograde analysis."""
+        moves = bytearray([ILLEGAL]) * POSITIONS
+        values = bytearray(POSITIONS)
+
+        # Group legal positions by piece count so each layer only needs the next one
+        layers = [[] for _ in range(CELLS + 1)]
+        for index in range(POSITIONS):
+            own_bits, opp_bits = _decode(index)
+            if _is_legal(own_bits, opp_bits):
+                layers[POPCOUNT[own_bits | opp_bits]].append((index, own_bits, opp_bits))
+
+        for layer in reversed(layers):
+            for index, own_bits, opp_bits in layer:
+                occupied = own_bits | opp_bits
+                if IS_WIN[opp_bits]:
+                    moves[index] = TERMINAL
+                    values[index] = -WIN_SCORE & 0xFF
+                    continue
+                if occupied == FULL_MASK:
+                    moves[index] = TERMINAL
+                    continue
+
+                best_score = None
+                best_move = None
+                for i in MOVES[FULL_MASK ^ occupied]:
+                    # Child position seen from the opponent, who moves next
+                    child = position_index(opp_bits, own_bits | (1 << i))
+                    score = -_signed(values[child])
+                    if best_score is None or score > best_score:
+                        best_score = score
+                        best_move = i
+                moves[index] = best_move
+                values[index] = _one_ply_back(best_score) & 0xFF
+
+        return cls(bytes(moves), bytes(values))
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """Loads a table from path; returns None if it is missing, corrupt or stale."""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        if len(data) != HEADER.size + 2 * POSITIONS:
+            return None
+        magic, version, cells, entries, fingerprint = HEADER.unpack_from(data)
+        if (magic != MAGIC or version != FORMAT_VERSION or cells != CELLS
+                or entries != POSITIONS or fingerprint != _fingerprint()):
+            return None
+
+        start = HEADER.size
+        return cls(data[start:start + POSITIONS], data[start + POSITIONS:])
+
+    def save(self, path=DEFAULT_PATH):
+        """Writes the table to path (atomically, via a temporary file)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, CELLS, POSITIONS, _fingerprint()))
+            f.write(self.moves)
+            f.write(self.values)
+        os.replace(tmp_path, path)
+
+    def best_move(self, own_bits, opp_bits):
+        """Returns the best (row, col) for the side to move, or None if not in the table."""
+        move = self.moves[position_index(own_bits, opp_bits)]
+        if move >= TERMINAL:
+            return None
+        return COORDS[move]
+
+    def value(self, own_bits, opp_bits):
+        """Returns the minimax score for the side to move, or None if not in the table."""
+        index = position_index(own_bits, opp_bits)
+        if self.moves[index] == ILLEGAL:
+            return None
+        return _signed(self.values[index])
+
+    def legal_positions(self):
+        """Yields (own_bits, opp_bits) for every non-terminal position in the table."""
+        for index in range(POSITIONS):
+            if self.moves[index] < TERMINAL:
+                yield _decode(index)
+
+
+def _signed(byte):
+    """Reads a stored byte back as a signed score."""
+    return byte - 256 if byte > 127 else byte
+
+
+def verify(tablebase, ai=None):
+    """
+    Checks the table against TicTacToeAI.find_best_move on every position.
+    Returns a list of (board, ai_player, table_move, search_move) mismatches.
+    """
+    ai = ai or TicTacToeAI()
+    mismatches = []
+    for own_bits, opp_bits in tablebase.legal_positions():
+        table_move = tablebase.best_move(own_bits, opp_bits)
+        # The table is colour-blind, so check the position with the AI as both X and O
+        for ai_player in ('X', 'O'):
+            if ai_player == 'X':
+                board = bits_to_board(own_bits, opp_bits)
+            else:
+                board = bits_to_board(opp_bits, own_bits)
+            search_move = ai.find_best_move(board, ai_player)
+            if search_move != table_move:
+                mismatches.append((board, ai_player, table_move, search_move))
+    return mismatches
+
+
+def load_or_build_tablebase(path=DEFAULT_PATH, check=True):
+    """
+    Loads the tablebase from path, rebuilding (and saving) it if the file is
+    missing or stale. A rebuilt table is verified against find_best_move.
+    """
+    tablebase = Tablebase.load(path)
+    if tablebase is not None:
+        return tablebase
+
+    print(f"Building tablebase at: {path}")
+    tablebase = Tablebase.build()
+    if check:
+        mismatches = verify(tablebase)
+        if mismatches:
+            raise ValueError(f"Tablebase disagrees with find_best_move on {len(mismatches)} positions")
+    try:
+        tablebase.save(path)
+    except OSError as e:
+        # Read-only deployments still get the in-memory table
+        print(f"Could not save tablebase: {e}")
+    return tablebase
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and verify the 3x3 hard-mode tablebase')
+    parser.add_argument('--output', '-o', default=DEFAULT_PATH, help=f'Output file (default: {DEFAULT_PATH})')
+    parser.add_argument('--no-verify', action='store_true', help='Skip the check against find_best_move')
+    args = parser.parse_args()
+
+    tablebase = Tablebase.build()
+    positions = sum(1 for _ in tablebase.legal_positions())
+    print(f"Solved {positions} non-terminal positions")
+
+    if not args.no_verify:
+        mismatches = verify(tablebase)
+        if mismatches:
+            for board, ai_player, table_move, search_move in mismatches[:10]:
+                print(f"  {ai_player} on {board}: table {table_move}, search {search_move}")
+            print(f"❌ {len(mismatches)} mismatches against find_best_move")
+            sys.exit(1)
+        print("✅ Verified against find_best_move on every position")
+
+    tablebase.save(args.output)
+    print(f"Tablebase saved to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,65 @@
 import math
 import random
+import time
+
+from bitboard import (CELLS, FULL_MASK, CENTER_MASK, CORNER_MASK, WIN_MASKS, IS_WIN,
+                      MOVES, POPCOUNT, COORDS, board_to_bits, player_bits, winner_of,
+                      canonical_key, get_geometry)
+from search_state import SearchState, SearchResult
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+from cache import LRUCache
+from search_stats import CountingLookup
+
+# Heuristic contribution of one line, indexed by ai_count * 4 + opp_count
+_LINE_SCORES = [0] * 16
+for _ai_count in range(4):
+    for _opp_count in range(4 - _ai_count):
+        _empty_count = 3 - _ai_count - _opp_count
+        _score = 0
+        if _ai_count == 2 and _empty_count == 1:
+            _score += 5  # Strong threat
+        if _ai_count == 1 and _empty_count == 2:
+            _score += 1
+        if _opp_count == 2 and _empty_count == 1:
+            _score += 4  # Must block
+        if _opp_count == 1 and _empty_count == 2:
+            _score -= 1
+        _LINE_SCORES[_ai_count * 4 + _opp_count] = _score
+_LINE_SCORES = tuple(_LINE_SCORES)
+
+# Positional part of the heuristic per cell: [AI, opponent]
+_CELL_SCORES = (
+    tuple(3 if (1 << i) & CENTER_MASK else 1 if (1 << i) & CORNER_MASK else 0 for i in range(CELLS)),
+    tuple(-2 if (1 << i) & CENTER_MASK else -1 if (1 << i) & CORNER_MASK else 0 for i in range(CELLS)),
+)
+_GEOMETRY = get_geometry(3, 3, 3)
+
+def _score_to_tt(score, depth):
+    """Makes a win/loss score relative to the node it was found at."""
+    if score > 0:
+        return score + depth
+    if score < 0:
+        return score - depth
+    return score
+
+def _score_from_tt(score, depth):
+    """Turns a node-relative score back into one relative to the search root."""
+    if score > 0:
+        return score - depth
+    if score < 0:
+        return score + depth
+    return score
 
 class TicTacToeAI:
-    def __init__(self):
-        pass
+    def __init__(self, tt_max_entries=100000, memo_max_entries=100000):
+        # Shared by every hard-mode search on this instance
+        self.transposition_table = TranspositionTable(tt_max_entries)
+        # Medium mode memos: DFS scores keyed by (ai_bits, opp_bits, depth, max_depth,
+        # is_maximizing) and heuristic scores keyed by (ai_bits, opp_bits)
+        self.dfs_memo = LRUCache(memo_max_entries)
+        self.heuristic_memo = LRUCache(memo_max_entries)
+        # Optional perfect-play table (see tablebase.py); hard_move searches without it
+        self.tablebase = None
 
     # --- 1. Board Representation and Game Logic ---
 
@@ -22,32 +78,18 @@ class TicTacToeAI:
 
     def get_possible_moves(self, board):
         """Returns a list of all empty (row, col) spots on the board."""
-        moves = []
-        for r in range(3):
-            for c in range(3):
-                if board[r][c] == ' ':
-                    moves.append((r, c))
-        return moves
+        x_bits, o_bits = board_to_bits(board)
+        return [COORDS[i] for i in MOVES[FULL_MASK ^ (x_bits | o_bits)]]
 
     def check_winner(self, board):
         """Checks if there's a winner and returns the winner or None."""
-        players = ['X', 'O']
-        for player in players:
-            # Check rows, columns, and diagonals
-            for i in range(3):
-                if all(board[i][j] == player for j in range(3)): 
-                    return player  # Row
-                if all(board[j][i] == player for j in range(3)): 
-                    return player  # Column
-            if all(board[i][i] == player for i in range(3)): 
-                return player  # Diagonal
-            if all(board[i][2-i] == player for i in range(3)): 
-                return player  # Anti-diagonal
-        return None
+        x_bits, o_bits = board_to_bits(board)
+        return winner_of(x_bits, o_bits)
 
     def is_board_full(self, board):
         """Checks if the board has any empty spaces left."""
-        return len(self.get_possible_moves(board)) == 0
+        x_bits, o_bits = board_to_bits(board)
+        return (x_bits | o_bits) == FULL_MASK
 
     def get_game_state(self, board):
         """Returns the current game state: winner or 'tie' or None if ongoing."""
@@ -62,13 +104,14 @@ class TicTacToeAI:
 
     def find_winning_move(self, board, player):
         """Finds a winning move for the given player, returns None if none exists."""
-        moves = self.get_possible_moves(board)
-        for r, c in moves:
-            board[r][c] = player
-            if self.check_winner(board) == player:
-                board[r][c] = ' '
-                return (r, c)
-            board[r][c] = ' '
+        x_bits, o_bits = board_to_bits(board)
+        # check_winner reports X first, so O can never "win" over an existing X line
+        if player == 'O' and IS_WIN[x_bits]:
+            return None
+        own = x_bits if player == 'X' else o_bits
+        for i in MOVES[FULL_MASK ^ (x_bits | o_bits)]:
+            if IS_WIN[own | (1 << i)]:
+                return COORDS[i]
         return None
 
     def find_blocking_move(self, board, ai_player):
@@ -155,58 +198,34 @@ class TicTacToeAI:
         - Center control
         - Corner positions
         """
-        opponent = 'X' if ai_player == 'O' else 'O'
+        ai_bits, opp_bits = player_bits(board, ai_player)
+        return self._memo_heuristic(ai_bits, opp_bits)
+
+    def _memo_heuristic(self, ai_bits, opp_bits):
+        """_heuristic_bits through the heuristic memo."""
+        key = (ai_bits, opp_bits)
+        score = self.heuristic_memo.get(key)
+        if score is None:
+            score = self._heuristic_bits(ai_bits, opp_bits)
+            self.heuristic_memo.put(key, score)
+        return score
+
+    def _heuristic_bits(self, ai_bits, opp_bits):
+        """Bitboard version of advanced_heuristic_evaluate."""
         score = 0
-        
-        # Check all lines (rows, columns, diagonals)
-        lines = [
-            # Rows
-            [(0, 0), (0, 1), (0, 2)],
-            [(1, 0), (1, 1), (1, 2)],
-            [(2, 0), (2, 1), (2, 2)],
-            # Columns
-            [(0, 0), (1, 0), (2, 0)],
-            [(0, 1), (1, 1), (2, 1)],
-            [(0, 2), (1, 2), (2, 2)],
-            # Diagonals
-            [(0, 0), (1, 1), (2, 2)],
-            [(0, 2), (1, 1), (2, 0)]
-        ]
-        
-        for line in lines:
-            ai_count = sum(1 for r, c in line if board[r][c] == ai_player)
-            opp_count = sum(1 for r, c in line if board[r][c] == opponent)
-            empty_count = sum(1 for r, c in line if board[r][c] == ' ')
-            
-            # AI has two in a row with open end (threat)
-            if ai_count == 2 and empty_count == 1:
-                score += 5  # Strong threat
-            
-            # AI has one with two open ends (potential)
-            if ai_count == 1 and empty_count == 2:
-                score += 1
-            
-            # Block opponent's two-in-a-row (blocking immediate win)
-            if opp_count == 2 and empty_count == 1:
-                score += 4  # Must block
-            
-            # Opponent has one with two open ends (defensive)
-            if opp_count == 1 and empty_count == 2:
-                score -= 1
-        
+        for line in WIN_MASKS:
+            score += _LINE_SCORES[POPCOUNT[ai_bits & line] * 4 + POPCOUNT[opp_bits & line]]
+
         # Center control
-        if board[1][1] == ai_player:
+        if ai_bits & CENTER_MASK:
             score += 3
-        elif board[1][1] == opponent:
+        elif opp_bits & CENTER_MASK:
             score -= 2
-        
+
         # Corner positions (for opening)
-        corners = [(0, 0), (0, 2), (2, 0), (2, 2)]
-        ai_corners = sum(1 for r, c in corners if board[r][c] == ai_player)
-        opp_corners = sum(1 for r, c in corners if board[r][c] == opponent)
-        score += ai_corners * 1
-        score -= opp_corners * 1
-        
+        score += POPCOUNT[ai_bits & CORNER_MASK]
+        score -= POPCOUNT[opp_bits & CORNER_MASK]
+
         return score
 
     def medium_move_limited_dfs(self, board, ai_player, max_depth=2):
@@ -230,21 +249,31 @@ class TicTacToeAI:
             return winning
 
         # Limited-depth DFS with heuristic evaluation
+        # (scores only depend on the position, so they come from the memos when
+        # it was seen before; the random choices above and below are unchanged)
+        ai_bits, opp_bits = player_bits(board, ai_player)
+        state = None
         move_scores = []
         
-        for move in moves:
-            r, c = move
-            board[r][c] = ai_player
+        for i in MOVES[FULL_MASK ^ (ai_bits | opp_bits)]:
+            child_bits = ai_bits | (1 << i)
             
             # DFS search with limited depth
-            score = self.dfs_search(board, 0, max_depth, False, ai_player)
+            key = (child_bits, opp_bits, 0, max_depth, False)
+            score = self.dfs_memo.get(key)
+            if score is None:
+                if state is None:
+                    state = self._search_state(ai_bits, opp_bits)
+                state.make(i, 0)
+                score = self._dfs_node(state, 0, max_depth, False)
+                state.unmake(i, 0)
+                self.dfs_memo.put(key, score)
             
             # Also consider immediate heuristic value
-            immediate_score = self.advanced_heuristic_evaluate(board, ai_player)
+            immediate_score = self._memo_heuristic(child_bits, opp_bits)
             combined_score = score * 0.7 + immediate_score * 0.3
             
-            move_scores.append((move, combined_score))
-            board[r][c] = ' '
+            move_scores.append((COORDS[i], combined_score))
         
         # Sort by score
         move_scores.sort(key=lambda x: x[1], reverse=True)
@@ -263,41 +292,65 @@ class TicTacToeAI:
         """
         Limited-depth DFS search with heuristic cutoff.
         """
+        ai_bits, opp_bits = player_bits(board, ai_player)
+        key = (ai_bits, opp_bits, depth, max_depth, is_maximizing)
+        score = self.dfs_memo.get(key)
+        if score is None:
+            score = self._dfs_node(self._search_state(ai_bits, opp_bits), depth, max_depth, is_maximizing)
+            self.dfs_memo.put(key, score)
+        return score
+
+    def _search_state(self, ai_bits, opp_bits):
+        """Incremental state for the medium search, scored with advanced_heuristic_evaluate."""
+        return SearchState(_GEOMETRY, _LINE_SCORES, _CELL_SCORES, ai_bits, opp_bits)
+
+    def _dfs_node(self, state, depth, max_depth, is_maximizing):
+        """Scores the position a DFS starts from (side 0 of state is the AI)."""
         # Check terminal states
-        winner = self.check_winner(board)
-        opponent = 'X' if ai_player == 'O' else 'O'
-        
-        if winner == ai_player:
+        ai_bits, opp_bits = state.bits
+        if IS_WIN[ai_bits]:
             return 10 - depth
-        if winner == opponent:
+        if IS_WIN[opp_bits]:
             return depth - 10
-        if self.is_board_full(board):
+        if (ai_bits | opp_bits) == FULL_MASK:
             return 0
         
         # If max depth reached, use heuristic evaluation
         if depth >= max_depth:
-            return self.advanced_heuristic_evaluate(board, ai_player)
-        
-        moves = self.get_possible_moves(board)
-        if not moves:
-            return 0
-        
-        if is_maximizing:
-            best_score = -math.inf
-            for r, c in moves:
-                board[r][c] = ai_player
-                score = self.dfs_search(board, depth + 1, max_depth, False, ai_player)
-                board[r][c] = ' '
-                best_score = max(best_score, score)
-            return best_score
-        else:
-            best_score = math.inf
-            for r, c in moves:
-                board[r][c] = opponent
-                score = self.dfs_search(board, depth + 1, max_depth, True, ai_player)
-                board[r][c] = ' '
-                best_score = min(best_score, score)
-            return best_score
+            return state.score
+        return self._dfs_children(state, depth, max_depth, is_maximizing)
+
+    def _dfs_children(self, state, depth, max_depth, is_maximizing):
+        """
+        Searches the children of a non-terminal node with make/unmake.
+        A win can only come from the move just made, so make() reports it.
+        """
+        side = 0 if is_maximizing else 1
+        child_depth = depth + 1
+        bits = state.bits
+        moves = MOVES[FULL_MASK ^ (bits[0] | bits[1])]
+        # Children that are leaves are scored with peek() instead of make/unmake
+        leaves = child_depth >= max_depth or len(moves) == 1
+        best_score = -math.inf if is_maximizing else math.inf
+        for i in moves:
+            if leaves:
+                won, score = state.peek(i, side)
+                if won:
+                    score = 10 - child_depth if is_maximizing else child_depth - 10
+                elif len(moves) == 1:
+                    score = 0  # Board is now full
+            elif state.make(i, side):
+                score = 10 - child_depth if is_maximizing else child_depth - 10
+                state.unmake(i, side)
+            else:
+                score = self._dfs_children(state, child_depth, max_depth, not is_maximizing)
+                state.unmake(i, side)
+            if is_maximizing:
+                if score > best_score:
+                    best_score = score
+            elif score < best_score:
+                best_score = score
+        return best_score
 
     def medium_move(self, board, ai_player, max_depth=2):
         """
@@ -309,7 +362,13 @@ class TicTacToeAI:
         """
         Hard difficulty: Full minimax with alpha-beta pruning (unbeatable).
         Strategy: Always plays optimally using full game tree search.
+        Uses the tablebase lookup when one is loaded.
         """
+        if self.tablebase is not None:
+            ai_bits, opp_bits = player_bits(board, ai_player)
+            move = self.tablebase.best_move(ai_bits, opp_bits)
+            if move is not None:
+                return move
         return self.find_best_move(board, ai_player)
 
     # --- 3. The AI Brain (Minimax with Alpha-Beta Pruning) ---
@@ -320,55 +379,79 @@ class TicTacToeAI:
         'is_maximizing' is True when it's the AI's turn, False for opponent's turn.
         'ai_player' specifies which player the AI is ('X' or 'O').
         """
-        # Determine opponent
-        opponent = 'X' if ai_player == 'O' else 'O'
-        
+        ai_bits, opp_bits = player_bits(board, ai_player)
+        return self._minimax_bits(ai_bits, opp_bits, depth, alpha, beta, is_maximizing)
+
+    def _minimax_bits(self, ai_bits, opp_bits, depth, alpha, beta, is_maximizing):
+        """Bitboard version of minimax; ai_bits/opp_bits are the two sides."""
         # Check for terminal states: win, lose, or draw
-        winner = self.check_winner(board)
-        if winner == ai_player:
+        if IS_WIN[ai_bits]:
             return 10 - depth  # AI wins, score is positive
-        if winner == opponent:
+        if IS_WIN[opp_bits]:
             return depth - 10  # Opponent wins, score is negative
-        if self.is_board_full(board):
+        occupied = ai_bits | opp_bits
+        if occupied == FULL_MASK:
             return 0  # Draw
 
+        # Transposition table lookup (scores are stored relative to this node)
+        key = (canonical_key(ai_bits, opp_bits) << 1) | is_maximizing
+        entry = self.transposition_table.get(key)
+        if entry is not None:
+            score, flag = entry
+            score = _score_from_tt(score, depth)
+            if flag == EXACT:
+                return score
+            if flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if beta <= alpha:
+                return score
+        window_alpha, window_beta = alpha, beta
+
         if is_maximizing:  # AI's turn - wants to maximize the score
             best_score = -math.inf
-            for r, c in self.get_possible_moves(board):
-                board[r][c] = ai_player
-                score = self.minimax(board, depth + 1, alpha, beta, False, ai_player)
-                board[r][c] = ' '
-                best_score = max(score, best_score)
-                alpha = max(alpha, score)
+            for i in MOVES[FULL_MASK ^ occupied]:
+                score = self._minimax_bits(ai_bits | (1 << i), opp_bits, depth + 1, alpha, beta, False)
+                if score > best_score:
+                    best_score = score
+                if score > alpha:
+                    alpha = score
                 if beta <= alpha:
                     break  # Alpha-beta pruning
-            return best_score
         else:  # Opponent's turn - wants to minimize the score
             best_score = math.inf
-            for r, c in self.get_possible_moves(board):
-                board[r][c] = opponent
-                score = self.minimax(board, depth + 1, alpha, beta, True, ai_player)
-                board[r][c] = ' '
-                best_score = min(best_score, score)
-                beta = min(beta, score)
+            for i in MOVES[FULL_MASK ^ occupied]:
+                score = self._minimax_bits(ai_bits, opp_bits | (1 << i), depth + 1, alpha, beta, True)
+                if score < best_score:
+                    best_score = score
+                if score < beta:
+                    beta = score
                 if beta <= alpha:
                     break  # Alpha-beta pruning
-            return best_score
+
+        if best_score <= window_alpha:
+            flag = UPPER
+        elif best_score >= window_beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.transposition_table.store(key, _score_to_tt(best_score, depth), flag)
+        return best_score
 
     def find_best_move(self, board, ai_player='O'):
         """Finds the best move for the AI by calling the minimax algorithm."""
+        ai_bits, opp_bits = player_bits(board, ai_player)
         best_score = -math.inf
         move = None
         
-        for r, c in self.get_possible_moves(board):
-            board[r][c] = ai_player
+        for i in MOVES[FULL_MASK ^ (ai_bits | opp_bits)]:
             # After AI makes a move, it's opponent's turn (minimizing)
-            score = self.minimax(board, 0, -math.inf, math.inf, False, ai_player)
-            board[r][c] = ' '
+            score = self._minimax_bits(ai_bits | (1 << i), opp_bits, 0, -math.inf, math.inf, False)
             
             if score > best_score:
                 best_score = score
-                move = (r, c)
+                move = COORDS[i]
         
         return move
 
@@ -392,6 +475,78 @@ class TicTacToeAI:
             # Default to hard if invalid difficulty
             return self.hard_move(board_copy, ai_player)
 
+    def get_best_move_result(self, board, ai_player='O', difficulty='hard', time_budget=None, stats=None):
+        """
+        Same move as get_best_move, returned as a SearchResult with the depth searched.
+        3x3 searches always finish well inside any budget (hard mode is a tablebase
+        lookup or a full minimax), so time_budget is only accepted for parity with
+        MNKEngine and completed is always True.
+        With a SearchStats the search runs instrumented and fills it in.
+        """
+        if stats is not None:
+            started = time.perf_counter()
+            result = _InstrumentedAI(self, stats).get_best_move_result(board, ai_player, difficulty, time_budget)
+            stats.wall_time += time.perf_counter() - started
+            return result._replace(nodes=stats.nodes)
+        move = self.get_best_move(board, ai_player, difficulty)
+        if move is None:
+            return SearchResult(None, None, 0, True, None)
+        difficulty = difficulty.lower()
+        if difficulty == 'easy':
+            depth = 1  # Only looks for immediate wins and blocks
+        elif difficulty == 'medium':
+            depth = 2
+        else:
+            # Hard mode searches to the end of the game
+            x_bits, o_bits = board_to_bits(board)
+            depth = POPCOUNT[FULL_MASK ^ (x_bits | o_bits)]
+        return SearchResult(move, None, depth, True, None)
+
+class _InstrumentedAI(TicTacToeAI):
+    """
+    View of a TicTacToeAI that counts into a SearchStats while it searches.
+    It shares the caches and tablebase of the wrapped AI (lookups go through
+    CountingLookup); the plain class stays free of counters.
+    """
+
+    def __init__(self, ai, stats):
+        self.__dict__.update(ai.__dict__)
+        self.stats = stats
+        self.transposition_table = CountingLookup(ai.transposition_table, stats)
+        self.dfs_memo = CountingLookup(ai.dfs_memo, stats)
+        self.heuristic_memo = CountingLookup(ai.heuristic_memo, stats)
+        if ai.tablebase is not None:
+            self.tablebase = CountingLookup(ai.tablebase, stats)
+
+    def _minimax_bits(self, ai_bits, opp_bits, depth, alpha, beta, is_maximizing):
+        stats = self.stats
+        stats.nodes += 1
+        # depth counts from the root's children (0), so the ply is one more
+        if depth + 1 > stats.max_depth:
+            stats.max_depth = depth + 1
+        score = TicTacToeAI._minimax_bits(self, ai_bits, opp_bits, depth, alpha, beta, is_maximizing)
+        # A non-terminal node that fails outside its window was cut off
+        if (score >= beta if is_maximizing else score <= alpha) and not (
+                IS_WIN[ai_bits] or IS_WIN[opp_bits] or (ai_bits | opp_bits) == FULL_MASK):
+            stats.cutoffs += 1
+        return score
+
+    def _dfs_node(self, state, depth, max_depth, is_maximizing):
+        stats = self.stats
+        stats.nodes += 1
+        if depth + 1 > stats.max_depth:
+            stats.max_depth = depth + 1
+        return TicTacToeAI._dfs_node(self, state, depth, max_depth, is_maximizing)
+
+    def _dfs_children(self, state, depth, max_depth, is_maximizing):
+        # Every child is visited (the limited DFS does not prune); leaves are only peeked
+        stats = self.stats
+        bits = state.bits
+        stats.nodes += POPCOUNT[FULL_MASK ^ (bits[0] | bits[1])]
+        if depth + 2 > stats.max_depth:
+            stats.max_depth = depth + 2
+        return TicTacToeAI._dfs_children(self, state, depth, max_depth, is_maximizing)
+
 # Keep your original main function for testing
 def main():
     """Main function to run the Tic-Tac-Toe game."""
@@ -0,0 +1,22 @@
+"""
+Transposition table for the hard-mode minimax search.
+
+Positions are stored under their canonical bitboard key (see
+bitboard.canonical_key), so all 8 rotations/reflections of a position share
+one entry. Each entry keeps a score and whether that score is exact or only a
+lower/upper bound, which keeps lookups correct under alpha-beta pruning.
+"""
+
+from cache import LRUCache
+
+EXACT = 0
+LOWER = 1  # Real score is >= the stored score (search failed high)
+UPPER = 2  # Real score is <= the stored score (search failed low)
+
+
+class TranspositionTable(LRUCache):
+    """Bounded key -> (score, flag) store with least-recently-used eviction."""
+
+    def store(self, key, score, flag):
+        """Stores (score, flag) for key, evicting the oldest entry when full."""
+        self.put(key, (score, flag))
@@ -1,11 +1,13 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, Session
 from database.models import Base, Game, Move
 import os
 
-# Get the database path
+# Get the database path (DATABASE_PATH points the app at another SQLite file, e.g. for load tests)
 db_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database')
-db_path = os.path.join(db_dir, 'tictactoe.db')
+db_path = os.path.abspath(os.environ.get('DATABASE_PATH') or os.path.join(db_dir, 'tictactoe.db'))
+db_dir = os.path.dirname(db_path)
 
 # Create database directory if it doesn't exist
 os.makedirs(db_dir, exist_ok=True)
@@ -16,10 +18,39 @@ engine = create_engine(f'sqlite:///{db_path}', echo=False)
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def init_db():
-    """Initialize the database by creating all tables"""
-    Base.metadata.create_all(bind=engine)
-    print(f"Database initialized at: {db_path}")
+def init_db(bind=None):
+    """Initialize the database by creating all tables (bind: another engine, default the app's)"""
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    add_missing_columns(bind)
+    add_missing_indexes(bind)
+    print(f"Database initialized at: {bind.url.database}")
+
+def add_missing_columns(bind):
+    """Add columns introduced after a table was first created (create_all skips existing tables)"""
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                if column.default is not None and column.default.is_scalar:
+                    ddl += f' DEFAULT {column.default.arg!r}'
+                conn.execute(text(ddl))
+                print(f"Added column {table.name}.{column.name}")
+
+def add_missing_indexes(bind):
+    """Add indexes introduced after a table was first created (create_all skips existing tables)"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=bind, checkfirst=True)
+            except IntegrityError:
+                # Rows written before the index existed break it (e.g. a move number logged twice)
+                print(f"Could not create unique index {index.name}: {table.name} has duplicate rows")
 
 def get_db() -> Session:
     """Get a database session"""
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic games for testing the database at scale.
+Games are played out by TicTacToeAI at mixed difficulties in parallel worker
+processes and bulk-inserted into the games and moves tables.
+
+Start times follow a realistic pattern: more games on recent days (steady
+growth), more in the evening than at night, and moves a few seconds apart.
+Game ids increase with created_at, as they do for real play.
+
+Usage: python database/generate_games.py --games 1000000 [--workers 8] [--days 90]
+"""
+
+import argparse
+import bisect
+import multiprocessing
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+backend_dir = os.path.join(parent_dir, 'backend')
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from sqlalchemy import create_engine, func, select
+from database.models import Game, Move
+from tictactoe_ai import TicTacToeAI
+from tablebase import load_or_build_tablebase
+
+# Share of games per AI difficulty, and of the simulated players' skill
+AI_DIFFICULTIES = (('easy', 0.3), ('medium', 0.4), ('hard', 0.3))
+PLAYER_SKILLS = (('easy', 0.5), ('medium', 0.4), ('hard', 0.1))
+
+# Relative number of games started in each hour of the day (quiet at night, busy in the evening)
+HOURLY_ACTIVITY = (2, 1, 1, 1, 1, 2, 3, 4, 5, 6, 6, 7, 8, 7, 7, 7, 8, 9, 11, 12, 12, 10, 7, 4)
+# Busiest day of the span relative to the first one
+GROWTH = 3.0
+
+# Same text format SQLAlchemy uses for DateTime columns on SQLite
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+GAME_COLUMNS = ('id', 'player_symbol', 'ai_symbol', 'difficulty', 'result', 'winner',
+                'rows', 'cols', 'k', 'created_at')
+MOVE_COLUMNS = ('game_id', 'move_number', 'row', 'col', 'player', 'is_ai_move', 'created_at')
+
+# Per-process AI, set up by _init_worker
+_ai = None
+
+
+def _init_worker():
+    global _ai
+    _ai = TicTacToeAI()
+    _ai.tablebase = load_or_build_tablebase()
+
+
+def hourly_cdf(days):
+    """Cumulative share of games up to the end of each hour of the span."""
+    weights = []
+    for day in range(days):
+        trend = 1 + (GROWTH - 1) * day / max(days - 1, 1)
+        weights.extend(trend * activity for activity in HOURLY_ACTIVITY)
+    total = sum(weights)
+    cdf = []
+    running = 0.0
+    for weight in weights:
+        running += weight
+        cdf.append(running / total)
+    return cdf
+
+
+def _start_time(u, start, cdf):
+    """Inverse of the hourly CDF: the start time of the game at quantile u."""
+    hour = min(bisect.bisect_left(cdf, u), len(cdf) - 1)
+    low = cdf[hour - 1] if hour else 0.0
+    within = (u - low) / (cdf[hour] - low)
+    return start + timedelta(hours=hour + within)
+
+
+def _pick(rng, weighted):
+    value = rng.random()
+    for name, weight in weighted:
+        value -= weight
+        if value < 0:
+            return name
+    return weighted[-1][0]
+
+
+def play_game(ai, rng, ai_difficulty, player_skill, player_symbol):
+    """Plays one game; returns (moves, winner) with moves as (row, col, player)."""
+    ai_symbol = 'O' if player_symbol == 'X' else 'X'
+    board = ai.create_board()
+    moves = []
+    turn = 'X'
+    while True:
+        if turn == ai_symbol:
+            row, col = ai.get_best_move(board, ai_symbol, ai_difficulty)
+        else:
+            row, col = ai.get_best_move(board, player_symbol, player_skill)
+        board[row][col] = turn
+        moves.append((row, col, turn))
+        winner = ai.check_winner(board)
+        if winner or ai.is_board_full(board):
+            return moves, winner
+        turn = 'O' if turn == 'X' else 'X'
+
+
+def generate_chunk(job):
+    """
+    Worker task: plays games first_index .. first_index + count - 1 of the run.
+    Returns (game rows, move rows) ready for executemany.
+    """
+    first_id, first_index, count, total, start, cdf, seed = job
+    # Python's random is not shared with the parent, so seed per chunk for repeatable runs
+    random.seed(seed + first_index)
+    rng = random.Random(seed * 7919 + first_index)
+    games = []
+    moves = []
+    for n in range(count):
+        index = first_index + n
+        game_id = first_id + index
+        created_at = _start_time((index + rng.random()) / total, start, cdf)
+
+        ai_difficulty = _pick(rng, AI_DIFFICULTIES)
+        player_symbol = 'X' if rng.random() < 0.5 else 'O'
+        played, winner = play_game(_ai, rng, ai_difficulty, _pick(rng, PLAYER_SKILLS), player_symbol)
+
+        if winner is None:
+            result = 'tie'
+        elif winner == player_symbol:
+            result = 'win'
+        else:
+            result = 'loss'
+        games.append((game_id, player_symbol, 'O' if player_symbol == 'X' else 'X', ai_difficulty,
+                      result, winner, 3, 3, 3, created_at.strftime(DATETIME_FORMAT)))
+
+        # Players think for a few seconds, the AI answers in well under one
+        moment = created_at
+        for number, (row, col, player) in enumerate(played, 1):
+            is_ai = player != player_symbol
+            moment += timedelta(seconds=rng.uniform(0.2, 1.0) if is_ai else rng.expovariate(1 / 3.5))
+            moves.append((game_id, number, row, col, player, int(is_ai), moment.strftime(DATETIME_FORMAT)))
+    return games, moves
+
+
+def _insert_sql(table, columns):
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def generate(engine, total_games, workers, days, chunk_size, seed):
+    """Generates and inserts total_games games; returns (games/sec overall, rows/sec inserted)."""
+    with engine.connect() as conn:
+        first_id = (conn.execute(select(func.max(Game.id))).scalar() or 0) + 1
+
+    end = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    start = end - timedelta(days=days)
+    cdf = hourly_cdf(days)
+    jobs = [(first_id, i, min(chunk_size, total_games - i), total_games, start, cdf, seed)
+            for i in range(0, total_games, chunk_size)]
+
+    insert_game = _insert_sql(Game.__tablename__, GAME_COLUMNS)
+    insert_move = _insert_sql(Move.__tablename__, MOVE_COLUMNS)
+
+    # Raw DB-API connection: executemany over plain tuples is the fastest insert path
+    connection = engine.raw_connection()
+    cursor = connection.cursor()
+    if engine.dialect.name == 'sqlite':
+        # Bulk-load settings for this connection only; a crash loses the load, not older data
+        cursor.execute('PRAGMA synchronous = OFF')
+        cursor.execute('PRAGMA temp_store = MEMORY')
+        cursor.execute('PRAGMA cache_size = -262144')  # 256 MB
+
+    started = time.perf_counter()
+    insert_time = 0.0
+    rows_inserted = 0
+    done = 0
+    try:
+        with multiprocessing.get_context('spawn').Pool(workers, initializer=_init_worker) as pool:
+            # imap keeps chunk order so ids are inserted in ascending order
+            for games, moves in pool.imap(generate_chunk, jobs):
+                insert_started = time.perf_counter()
+                cursor.executemany(insert_game, games)
+                cursor.executemany(insert_move, moves)
+                connection.commit()
+                insert_time += time.perf_counter() - insert_started
+                rows_inserted += len(games) + len(moves)
+                done += len(games)
+
+                elapsed = time.perf_counter() - started
+                print(f"  {done}/{total_games} games ({done / elapsed:,.0f} games/sec)")
+    finally:
+        cursor.close()
+        connection.close()
+
+    elapsed = time.perf_counter() - started
+    return done / elapsed, (rows_inserted / insert_time if insert_time else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic games for database scale testing')
+    parser.add_argument('--games', '-n', type=int, default=10000, help='Number of games to generate (default: 10000)')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                        help='Simulation processes (default: CPU count)')
+    parser.add_argument('--days', type=int, default=90, help='Spread created_at over the last N days (default: 90)')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='Games per worker task and insert transaction (default: 5000)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--database', help='SQLite file to fill (default: the app database)')
+    args = parser.parse_args()
+
+    from database.db import init_db
+    if args.database:
+        engine = create_engine(f'sqlite:///{os.path.abspath(args.database)}', echo=False)
+    else:
+        from database.db import engine
+    # Also adds the columns and indexes an older database is missing
+    init_db(engine)
+    target = engine.url.database
+
+    print(f"Generating {args.games} games with {args.workers} workers into {target}")
+    games_per_sec, rows_per_sec = generate(engine, args.games, args.workers, max(args.days, 1),
+                                           max(args.chunk_size, 1), args.seed)
+    print(f"\nDone: {games_per_sec:,.0f} games/sec overall, inserts at {rows_per_sec:,.0f} rows/sec")
+
+
+if __name__ == '__main__':
+    main()
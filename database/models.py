@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -15,6 +15,9 @@ class Game(Base):
     difficulty = Column(String(10))  # 'easy', 'medium', 'hard'
     result = Column(String(10))  # 'win', 'loss', 'tie'
     winner = Column(String(1), nullable=True)  # 'X', 'O', or None for tie
+    rows = Column(Integer, default=3)  # Board rows
+    cols = Column(Integer, default=3)  # Board columns
+    k = Column(Integer, default=3)  # Pieces in a row needed to win
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship to moves
@@ -27,12 +30,16 @@ class Move(Base):
     id = Column(Integer, primary_key=True)
     game_id = Column(Integer, ForeignKey('games.id'), nullable=False)
     move_number = Column(Integer)  # Sequential move number (1, 2, 3, ...)
-    row = Column(Integer)  # Row position (0-2)
-    col = Column(Integer)  # Column position (0-2)
+    row = Column(Integer)  # Row position (0 to rows-1)
+    col = Column(Integer)  # Column position (0 to cols-1)
     player = Column(String(1))  # 'X' or 'O'
     is_ai_move = Column(Integer)  # 1 for AI, 0 for player
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship to game
     game = relationship("Game", back_populates="moves")
+    
+    # A move number is written once per game, so two requests that play the same
+    # turn cannot both be stored (the second insert fails)
+    __table_args__ = (Index('ix_moves_game_move_number', 'game_id', 'move_number', unique=True),)
 
@@ -82,12 +82,75 @@ class TicTacToeGame {
         
         if (this.board[row][col] === '') {
             console.log('Making human move...');
-            await this.makeMove(row, col, this.humanPlayer);
+            if (this.gameId) {
+                await this.play(row, col);
+            } else {
+                // No game session (start_game failed): use the separate endpoints
+                await this.makeMove(row, col, this.humanPlayer);
+            }
         } else {
             console.log('Cell already occupied');
         }
     }
 
+    async play(row, col) {
+        /* One request per turn: /play checks the move, gets the AI reply, logs both and detects the end */
+        try {
+            this.gameActive = false; // Ignore clicks until the reply arrives
+            if (row !== null) {
+                this.board[row][col] = this.humanPlayer;
+                this.updateDisplay();
+            }
+            const difficultyNames = {
+                'easy': 'Easy',
+                'medium': 'Medium',
+                'hard': 'Hard',
+                'mcts': 'MCTS'
+            };
+            this.showMessage(`AI (${difficultyNames[this.difficulty]}) is thinking...`);
+            
+            const body = { game_id: this.gameId };
+            if (row !== null) {
+                body.row = row;
+                body.col = col;
+            }
+            const response = await fetch('/play', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify(body)
+            });
+            
+            const data = await response.json();
+            console.log('Play response:', data);
+            
+            if (!response.ok || data.error) {
+                throw new Error(data.error || `Server error: ${response.status}`);
+            }
+            
+            this.board = data.board;
+            this.moveNumber = data.move_number;
+            this.updateDisplay();
+            
+            if (data.game_state === 'ongoing') {
+                this.gameActive = true;
+                this.showMessage('Your turn!');
+            } else {
+                this.showGameResult(data.game_state);
+            }
+        } catch (error) {
+            console.error('Error in play:', error);
+            this.showMessage('Error: ' + error.message);
+            if (row !== null && this.board[row][col] === this.humanPlayer) {
+                // The move was not accepted, so take it back
+                this.board[row][col] = '';
+                this.updateDisplay();
+            }
+            this.gameActive = true;
+        }
+    }
+
     async makeMove(row, col, player) {
         try {
             console.log(`Making move: ${player} at (${row}, ${col})`);
@@ -126,7 +189,8 @@ class TicTacToeGame {
             const difficultyNames = {
                 'easy': 'Easy',
                 'medium': 'Medium',
-                'hard': 'Hard'
+                'hard': 'Hard',
+                'mcts': 'MCTS'
             };
             this.showMessage(`AI (${difficultyNames[this.difficulty]}) is thinking...`);
             console.log('Sending AI move request...');
@@ -141,7 +205,8 @@ class TicTacToeGame {
                 body: JSON.stringify({
                     board: this.board,
                     ai_player: this.aiPlayer,
-                    difficulty: this.difficulty
+                    difficulty: this.difficulty,
+                    game_id: this.gameId
                 })
             });
             
@@ -270,6 +335,11 @@ class TicTacToeGame {
             this.updateDisplay();
             this.showMessage('');
             
+            // X moves first, so the AI opens when it plays X
+            if (this.gameId && this.aiPlayer === 'X') {
+                await this.play(null, null);
+            }
+            
             console.log('Game reset complete');
             
         } catch (error) {
@@ -0,0 +1,67 @@
+"""
+Gunicorn configuration for production: gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is preloaded in the master: the database is initialized, the
+tablebase loaded and the AI tables built once (wsgi.py calls warm_up()),
+then the workers are forked and share those pages copy-on-write instead of
+each building its own. gc.freeze() before every fork keeps the collector
+from writing to the shared objects, which would copy their pages.
+
+Workers and threads are sized from the CPU count: one worker per core
+(searches hold the GIL, so a worker runs one at a time) and a few threads
+per worker for database writes and long-polls. Every setting can be
+overridden from the environment.
+"""
+import gc
+import glob
+import os
+import tempfile
+
+cpus = os.cpu_count() or 1
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 5001)}")
+workers = int(os.environ.get('GUNICORN_WORKERS', cpus))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+preload_app = True
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# Recycled workers are forked from the preloaded master again, so this is cheap
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+# The app reads these at import (after this file), per worker process: split
+# the cores between workers for the AI capacity and the /move_batch pool
+cores_per_worker = max(cpus // workers, 1)
+os.environ.setdefault('ADMISSION_CAPACITY', str(4 * cores_per_worker))
+os.environ.setdefault('MOVE_POOL_WORKERS', str(cores_per_worker))
+
+# With several workers, /metrics must add up every worker's values
+if workers > 1 and not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='tictactoe-metrics-')
+
+
+def on_starting(server):
+    # Values left by the workers of a previous run would be added to this one's
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+            os.remove(path)
+
+
+def pre_fork(server, worker):
+    # Everything loaded so far stays out of the workers' collections
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Connections opened by init_db() in the master must not be shared by the workers
+    from database.db import engine
+    engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    # Drops the live gauges (requests in flight) of the worker that exited
+    from metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+# Import the backend modules the way app.py does (flat, from backend/)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+backend_dir = os.path.join(project_root, 'backend')
+for path in (backend_dir, project_root):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# app creates its database at import; keep the tests out of database/tictactoe.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(prefix='tictactoe-tests-'), 'tictactoe.db'))
@@ -0,0 +1,163 @@
+import pytest
+
+import app as app_module
+from admission import AdmissionController
+from app import read_board
+from database.db import get_db_session
+from database.models import Move
+
+EMPTY = [[' '] * 3 for _ in range(3)]
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def start_game(client, difficulty='easy'):
+    response = client.post('/start_game', json={'player_symbol': 'X', 'ai_symbol': 'O', 'difficulty': difficulty})
+    assert response.status_code == 200
+    return response.get_json()['game_id']
+
+
+def logged_moves(game_id):
+    db = get_db_session()
+    try:
+        moves = db.query(Move).filter(Move.game_id == game_id).order_by(Move.move_number).all()
+        return [(move.move_number, move.row, move.col, move.player) for move in moves]
+    finally:
+        db.close()
+
+
+def log_directly(game_id, move_number, row, col, player):
+    """Writes a move the way another gunicorn worker would, bypassing this process's session."""
+    db = get_db_session()
+    try:
+        db.add(Move(game_id=game_id, move_number=move_number, row=row, col=col, player=player,
+                    is_ai_move=1 if player == 'O' else 0))
+        db.commit()
+    finally:
+        db.close()
+
+
+def free_cells(board):
+    # Response boards use '' for empty cells, like the frontend
+    return [(r, c) for r, row in enumerate(board) for c, cell in enumerate(row) if cell in ('', ' ')]
+
+
+# --- read_board ---
+
+@pytest.mark.parametrize('value', [
+    [True, False],  # JSON booleans are not bitmasks
+    [1, True],
+    'XX.......',  # two X and no O
+    'O........',  # O never moves first
+    [0b11, 0],
+    [1, 1],  # the same cell for both sides
+    [1 << 9, 0],  # off the board
+    'X' * 8,
+    [['X', ' '], [' ', ' ']],
+])
+def test_read_board_rejects(value):
+    with pytest.raises(ValueError):
+        read_board(value, 3, 3)
+
+
+def test_read_board_rejects_wrong_turn():
+    with pytest.raises(ValueError):
+        read_board('X........', 3, 3, to_move='X')
+    with pytest.raises(ValueError):
+        read_board([1, 2], 3, 3, to_move='O')
+
+
+def test_read_board_formats_agree():
+    expected = [['X', ' ', ' '], [' ', 'O', ' '], [' ', ' ', 'X']]
+    assert read_board('X...O...X', 3, 3, to_move='O') == expected
+    assert read_board([(1 << 0) | (1 << 8), 1 << 4], 3, 3, to_move='O') == expected
+    assert read_board([['X', '', ''], ['', 'O', ''], ['', '', 'X']], 3, 3) == expected
+
+
+def test_move_rejects_boolean_board(client):
+    response = client.post('/move', json={'board': [True, False], 'ai_player': 'O', 'difficulty': 'medium'})
+    assert response.status_code == 400
+
+
+# --- /play and /log_move ---
+
+def test_play_logs_both_moves(client):
+    game_id = start_game(client)
+    response = client.post('/play', json={'game_id': game_id, 'row': 1, 'col': 1})
+    assert response.status_code == 200
+    data = response.get_json()
+    ai_move = data['ai_move']
+    assert data['move_number'] == 2
+    assert logged_moves(game_id) == [(1, 1, 1, 'X'), (2, ai_move['row'], ai_move['col'], 'O')]
+
+
+def test_play_rolls_back_when_another_request_logged_the_turn(client, monkeypatch):
+    game_id = start_game(client, 'medium')
+    search = app_module.game_ai.get_best_move_result
+
+    def racing_search(*args):
+        # Another worker stores move 2 while this request is searching
+        log_directly(game_id, 2, 2, 2, 'O')
+        return search(*args)
+
+    monkeypatch.setattr(app_module.game_ai, 'get_best_move_result', racing_search)
+    response = client.post('/play', json={'game_id': game_id, 'row': 0, 'col': 0})
+    assert response.status_code == 409
+    # The player's move was in the same transaction, so it is not stored either
+    assert logged_moves(game_id) == [(2, 2, 2, 'O')]
+
+
+def test_log_move_twice_is_a_conflict(client):
+    game_id = start_game(client)
+    move = {'game_id': game_id, 'move_number': 1, 'row': 0, 'col': 0, 'player': 'X'}
+    assert client.post('/log_move', json=move).status_code == 200
+    response = client.post('/log_move', json=dict(move, row=1))
+    assert response.status_code == 409
+    assert logged_moves(game_id) == [(1, 0, 0, 'X')]
+
+
+def test_play_rebuilds_session_from_moves_table(client):
+    game_id = start_game(client)
+    board = client.post('/play', json={'game_id': game_id, 'row': 0, 'col': 0}).get_json()['board']
+
+    # Turns played by another worker: this process's session still has 2 moves
+    x_cell, o_cell, next_cell = free_cells(board)[:3]
+    log_directly(game_id, 3, *x_cell, 'X')
+    log_directly(game_id, 4, *o_cell, 'O')
+
+    response = client.post('/play', json={'game_id': game_id, 'row': next_cell[0], 'col': next_cell[1]})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['board'][x_cell[0]][x_cell[1]] == 'X'
+    assert data['board'][o_cell[0]][o_cell[1]] == 'O'
+    assert data['player_move'] == {'row': next_cell[0], 'col': next_cell[1], 'player': 'X'}
+    assert [move[0] for move in logged_moves(game_id)][:5] == [1, 2, 3, 4, 5]
+
+
+# --- Admission control ---
+
+def test_move_is_rejected_with_retry_after_when_saturated(client, monkeypatch):
+    admission = AdmissionController(capacity=1, max_queue=0, max_wait=0)
+    monkeypatch.setattr(app_module, 'move_admission', admission)
+    body = {'board': EMPTY, 'ai_player': 'X', 'difficulty': 'medium'}
+
+    weight = admission.acquire(1)
+    response = client.post('/move', json=body)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app_module.ADMISSION_RETRY_AFTER)
+
+    admission.release(weight)
+    assert client.post('/move', json=body).status_code == 200
+    # The request gave its capacity back on teardown
+    assert admission.stats()['in_use'] == 0
+
+
+def test_routes_without_search_skip_admission(client, monkeypatch):
+    admission = AdmissionController(capacity=1, max_queue=0, max_wait=0)
+    monkeypatch.setattr(app_module, 'move_admission', admission)
+    admission.acquire(1)
+    response = client.post('/check_game_state', json={'board': EMPTY})
+    assert response.status_code == 200
@@ -0,0 +1,90 @@
+import itertools
+
+import pytest
+
+from bitboard import board_to_bits, bits_to_board, string_to_bits, bits_to_string
+from tictactoe_ai import TicTacToeAI
+
+LINES = [[(r, c) for c in range(3)] for r in range(3)]
+LINES += [[(r, c) for r in range(3)] for c in range(3)]
+LINES += [[(i, i) for i in range(3)], [(i, 2 - i) for i in range(3)]]
+CORNERS = [(0, 0), (0, 2), (2, 0), (2, 2)]
+
+# Every 3x3 board, legal or not: 3^9 of them
+ALL_BOARDS = [[list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+              for cells in itertools.product(' XO', repeat=9)]
+
+
+# List-of-lists versions of the engine functions, as they were before bitboards
+
+def list_check_winner(board):
+    for player in ('X', 'O'):
+        if any(all(board[r][c] == player for r, c in line) for line in LINES):
+            return player
+    return None
+
+
+def list_possible_moves(board):
+    return [(r, c) for r in range(3) for c in range(3) if board[r][c] == ' ']
+
+
+def list_heuristic(board, ai_player):
+    opponent = 'X' if ai_player == 'O' else 'O'
+    score = 0
+    for line in LINES:
+        ai_count = sum(1 for r, c in line if board[r][c] == ai_player)
+        opp_count = sum(1 for r, c in line if board[r][c] == opponent)
+        empty_count = sum(1 for r, c in line if board[r][c] == ' ')
+        if ai_count == 2 and empty_count == 1:
+            score += 5
+        if ai_count == 1 and empty_count == 2:
+            score += 1
+        if opp_count == 2 and empty_count == 1:
+            score += 4
+        if opp_count == 1 and empty_count == 2:
+            score -= 1
+    if board[1][1] == ai_player:
+        score += 3
+    elif board[1][1] == opponent:
+        score -= 2
+    score += sum(1 for r, c in CORNERS if board[r][c] == ai_player)
+    score -= sum(1 for r, c in CORNERS if board[r][c] == opponent)
+    return score
+
+
+@pytest.fixture(scope='module')
+def ai():
+    return TicTacToeAI()
+
+
+def test_check_winner_matches_list_version(ai):
+    for board in ALL_BOARDS:
+        assert ai.check_winner(board) == list_check_winner(board), board
+
+
+def test_possible_moves_match_list_version(ai):
+    for board in ALL_BOARDS:
+        moves = list_possible_moves(board)
+        assert ai.get_possible_moves(board) == moves, board
+        assert ai.is_board_full(board) == (not moves), board
+
+
+def test_heuristic_matches_list_version(ai):
+    for board in ALL_BOARDS:
+        for ai_player in ('X', 'O'):
+            assert ai.advanced_heuristic_evaluate(board, ai_player) == list_heuristic(board, ai_player), board
+
+
+def test_conversions_round_trip():
+    for board in ALL_BOARDS:
+        x_bits, o_bits = board_to_bits(board)
+        assert bits_to_board(x_bits, o_bits) == board
+        text = bits_to_string(x_bits, o_bits)
+        assert text == ''.join(''.join(row) for row in board).replace(' ', '.')
+        assert string_to_bits(text) == (x_bits, o_bits)
+
+
+@pytest.mark.parametrize('text', ['X' * 8, 'X' * 10, 'XO......a', 'xo.......'])
+def test_string_to_bits_rejects_malformed(text):
+    with pytest.raises(ValueError):
+        string_to_bits(text)
@@ -0,0 +1,28 @@
+import pytest
+
+from job_queue import JobQueue, JobQueueFull, CANCELLED, QUEUED
+
+TASK = ([[' '] * 3 for _ in range(3)], 'O', 'hard', 3, 3, 3, None, None)
+
+
+def test_cancelled_job_frees_its_queue_slot():
+    # No dispatcher threads, so submitted jobs stay queued
+    jobs = JobQueue(max_depth=1, workers=0)
+    first = jobs.submit(TASK)
+    assert first.status == QUEUED
+    with pytest.raises(JobQueueFull):
+        jobs.submit(TASK)
+
+    assert jobs.cancel(first.id).status == CANCELLED
+    assert jobs.depth() == 0
+    second = jobs.submit(TASK)
+    assert second.status == QUEUED
+    assert jobs.depth() == 1
+
+
+def test_cancel_is_idempotent():
+    jobs = JobQueue(max_depth=1, workers=0)
+    job = jobs.submit(TASK)
+    jobs.cancel(job.id)
+    assert jobs.cancel(job.id).status == CANCELLED
+    assert jobs.cancel('unknown') is None
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from mnk_engine import MNKEngine
+from parallel_search import ParallelSearch, BENCHMARK_POSITIONS, serial_search, _position_bits
+
+DEPTH = 3
+
+
+def position(cols, x_cells, o_cells):
+    """(own, opp) with the side to move first."""
+    x_bits = _position_bits(cols, x_cells)
+    o_bits = _position_bits(cols, o_cells)
+    return (x_bits, o_bits) if len(x_cells) == len(o_cells) else (o_bits, x_bits)
+
+
+@pytest.fixture(scope='module')
+def searcher():
+    searcher = ParallelSearch(workers=2)
+    yield searcher
+    searcher.close()
+
+
+@pytest.mark.parametrize('label, rows, cols, k, x_cells, o_cells', BENCHMARK_POSITIONS)
+def test_parallel_matches_serial(searcher, label, rows, cols, k, x_cells, o_cells):
+    own, opp = position(cols, x_cells, o_cells)
+    expected = serial_search(rows, cols, k, own, opp, DEPTH)
+    result = searcher.search(rows, cols, k, own, opp, DEPTH)
+    assert (result.move, result.score) == (expected.move, expected.score)
+
+
+@pytest.mark.parametrize('label, rows, cols, k, x_cells, o_cells', BENCHMARK_POSITIONS)
+def test_parallel_engine_matches_serial_engine(searcher, label, rows, cols, k, x_cells, o_cells):
+    own, opp = position(cols, x_cells, o_cells)
+    expected = MNKEngine(rows, cols, k).search(own, opp, max_depth=DEPTH, time_budget=0)
+    result = MNKEngine(rows, cols, k, parallel=True).search(own, opp, max_depth=DEPTH, time_budget=0)
+    assert (result.move, result.score, result.depth) == (expected.move, expected.score, expected.depth)
+    assert result.score == serial_search(rows, cols, k, own, opp, DEPTH).score
+
+
+def test_parallel_engine_stops_at_time_budget(searcher):
+    label, rows, cols, k, x_cells, o_cells = BENCHMARK_POSITIONS[-1]
+    own, opp = position(cols, x_cells, o_cells)
+    started = time.perf_counter()
+    result = MNKEngine(rows, cols, k, parallel=True).search(own, opp, time_budget=0.2)
+    assert time.perf_counter() - started < 1.0
+    assert not result.completed
+    assert result.move is not None
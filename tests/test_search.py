@@ -0,0 +1,165 @@
+import functools
+import random
+
+import pytest
+
+from bitboard import bits_to_board, player_bits
+from mcts import MCTSEngine
+from mnk_engine import MNKEngine, INFINITY, WIN_SCORE
+from tablebase import Tablebase
+from tictactoe_ai import TicTacToeAI
+
+WIN_LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+
+
+def wins(cells, player):
+    return any(all(cells[i] == player for i in line) for line in WIN_LINES)
+
+
+@functools.lru_cache(maxsize=None)
+def score_after(cells, mover):
+    """
+    Plain minimax score for mover of the position right after mover played,
+    as TicTacToeAI.minimax counts it: 10 - plies to a win, plies - 10 to a loss.
+    """
+    if wins(cells, mover):
+        return 10
+    if ' ' not in cells:
+        return 0
+    opponent = 'O' if mover == 'X' else 'X'
+    best = max(score_after(cells[:i] + (opponent,) + cells[i + 1:], opponent)
+               for i, cell in enumerate(cells) if cell == ' ')
+    # One ply further away for mover
+    return -best + (best > 0) - (best < 0)
+
+
+def move_scores(cells, player):
+    return {(i // 3, i % 3): score_after(cells[:i] + (player,) + cells[i + 1:], player)
+            for i, cell in enumerate(cells) if cell == ' '}
+
+
+def reachable_positions():
+    """Every position of a real game that is not over yet, as (cells, side to move)."""
+    positions = []
+    frontier = {((' ',) * 9, 'X')}
+    while frontier:
+        positions.extend(frontier)
+        next_frontier = set()
+        for cells, player in frontier:
+            opponent = 'O' if player == 'X' else 'X'
+            for i, cell in enumerate(cells):
+                if cell == ' ':
+                    child = cells[:i] + (player,) + cells[i + 1:]
+                    if not wins(child, player) and ' ' in child:
+                        next_frontier.add((child, opponent))
+        frontier = next_frontier
+    return sorted(positions)
+
+
+POSITIONS = reachable_positions()
+
+
+def to_board(cells):
+    return [list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+
+
+def best_moves(cells, player):
+    scores = move_scores(cells, player)
+    best = max(scores.values())
+    return {move for move, score in scores.items() if score == best}
+
+
+def test_transposition_table_search_matches_minimax():
+    ai = TicTacToeAI()
+    for cells, player in POSITIONS:
+        assert ai.find_best_move(to_board(cells), player) in best_moves(cells, player), (cells, player)
+
+
+def test_tablebase_matches_minimax():
+    tablebase = Tablebase.build()
+    for cells, player in POSITIONS:
+        own, opp = player_bits(to_board(cells), player)
+        assert tablebase.best_move(own, opp) in best_moves(cells, player), (cells, player)
+
+
+def negamax(engine, own, opp, depth, ply):
+    """Fixed-depth negamax without pruning, scored like MNKEngine (own to move)."""
+    geometry = engine.geometry
+    if (own | opp) == geometry.full_mask:
+        return 0
+    if depth == 0:
+        return engine.evaluate(own, opp)
+    best = -INFINITY
+    for cell in engine.candidate_moves(own, opp):
+        bit = 1 << cell
+        if geometry.has_win(own | bit):
+            score = WIN_SCORE - ply - 1
+        else:
+            score = -negamax(engine, opp, own | bit, depth - 1, ply + 1)
+        best = max(best, score)
+    return best
+
+
+def cells_to_bits(cols, cells):
+    bits = 0
+    for r, c in cells:
+        bits |= 1 << (r * cols + c)
+    return bits
+
+
+# (rows, cols, k, cells of the side to move, cells of the other side)
+MNK_POSITIONS = [
+    (3, 3, 3, [], []),
+    (3, 3, 3, [(0, 0)], [(1, 1)]),
+    (3, 3, 3, [(1, 1), (0, 2)], [(0, 0), (2, 0)]),
+    (4, 4, 3, [], []),
+    (4, 4, 3, [(1, 1)], [(2, 2)]),
+    (4, 4, 3, [(0, 0), (1, 1)], [(0, 1), (3, 3)]),
+]
+
+
+@pytest.mark.parametrize('rows, cols, k, own_cells, opp_cells', MNK_POSITIONS)
+@pytest.mark.parametrize('depth', [1, 2, 3])
+def test_mnk_engine_matches_minimax_at_shallow_depth(rows, cols, k, own_cells, opp_cells, depth):
+    engine = MNKEngine(rows, cols, k)
+    own, opp = cells_to_bits(cols, own_cells), cells_to_bits(cols, opp_cells)
+    result = engine.search(own, opp, max_depth=depth, time_budget=0)
+    assert result.score == negamax(engine, own, opp, depth, 0)
+    cell = result.move[0] * cols + result.move[1]
+    bit = 1 << cell
+    score = WIN_SCORE - 1 if engine.geometry.has_win(own | bit) else -negamax(engine, opp, own | bit, depth - 1, 1)
+    assert score == result.score
+
+
+def test_mnk_engine_plays_perfectly_on_3x3():
+    engine = MNKEngine()
+    for cells, player in POSITIONS:
+        move = engine.get_best_move(to_board(cells), player, 'hard', time_budget=0)
+        assert move in best_moves(cells, player), (cells, player)
+
+
+# (board rows, AI symbol, the move that wins or blocks)
+FORCED_WINS = [
+    (('XX ', 'OO ', 'X  '), 'O', (1, 2)),
+    (('X O', ' X ', 'O  '), 'X', (2, 2)),
+    (('OO ', 'X  ', 'XX '), 'O', (0, 2)),
+]
+FORCED_BLOCKS = [
+    (('X  ', ' X ', 'O  '), 'O', (2, 2)),
+    (('XO ', 'X  ', '   '), 'O', (2, 0)),
+    (('O  ', 'XX ', '   '), 'O', (1, 2)),
+]
+
+
+@pytest.mark.parametrize('rows, ai_player, move', FORCED_WINS)
+def test_mcts_takes_forced_win(rows, ai_player, move):
+    random.seed(0)
+    board = [list(row) for row in rows]
+    assert MCTSEngine().get_best_move(board, ai_player, playouts=2000, time_budget=10) == move
+
+
+@pytest.mark.parametrize('rows, ai_player, move', FORCED_BLOCKS)
+def test_mcts_blocks_forced_loss(rows, ai_player, move):
+    random.seed(0)
+    board = [list(row) for row in rows]
+    assert MCTSEngine().get_best_move(board, ai_player, playouts=2000, time_budget=10) == move
@@ -14,7 +14,11 @@ backend_dir = os.path.join(project_root, 'backend')
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
-from backend.app import app
+from backend.app import app, warm_up
+
+# Under gunicorn with preload_app (gunicorn.conf.py) this runs once in the
+# master, before the workers are forked
+warm_up()
 
 if __name__ == "__main__":
     app.run()